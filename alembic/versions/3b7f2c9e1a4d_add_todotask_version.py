@@ -0,0 +1,37 @@
+"""add TodoTask version column
+
+Revision ID: 3b7f2c9e1a4d
+Revises: d000a7bf758a
+Create Date: 2026-10-19 10:12:04.518232
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+# FIXME: mypy doesn't understand alembic imports
+from alembic import op  # type: ignore
+
+# revision identifiers, used by Alembic.
+revision: str = "3b7f2c9e1a4d"
+down_revision: Union[str, None] = "d000a7bf758a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "todo_tasks",
+        sa.Column(
+            "version",
+            sa.Integer(),
+            server_default="1",
+            nullable=False,
+            comment="Row version for optimistic concurrency control",
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("todo_tasks", "version")
@@ -0,0 +1,45 @@
+"""add tags
+
+Revision ID: 5e9a3c7d1b24
+Revises: 3b7f2c9e1a4d
+Create Date: 2026-10-19 16:02:11.480913
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+# FIXME: mypy doesn't understand alembic imports
+from alembic import op  # type: ignore
+
+# revision identifiers, used by Alembic.
+revision: str = "5e9a3c7d1b24"
+down_revision: Union[str, None] = "3b7f2c9e1a4d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "tags",
+        sa.Column("name", sa.Text(), nullable=False, comment="Tag name"),
+        sa.Column("id", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("name"),
+    )
+    op.create_table(
+        "task_tags",
+        sa.Column("task_id", sa.BigInteger(), nullable=False),
+        sa.Column("tag_id", sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(["tag_id"], ["tags.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["task_id"], ["todo_tasks.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("task_id", "tag_id"),
+    )
+    op.create_index("ix_task_tags_tag_id_task_id", "task_tags", ["tag_id", "task_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_task_tags_tag_id_task_id", table_name="task_tags")
+    op.drop_table("task_tags")
+    op.drop_table("tags")
@@ -0,0 +1,51 @@
+"""add task owner
+
+Revision ID: a93f6e2d8b15
+Revises: e4a81c5b9d37
+Create Date: 2026-10-19 19:48:22.604193
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+# FIXME: mypy doesn't understand alembic imports
+from alembic import op  # type: ignore
+
+# revision identifiers, used by Alembic.
+revision: str = "a93f6e2d8b15"
+down_revision: Union[str, None] = "e4a81c5b9d37"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# NOTE: owner of the rows created before tasks were owner-scoped
+LEGACY_OWNER_ID = "legacy"
+
+
+def upgrade() -> None:
+    for table, comment in (("todo_tasks", "Owner (caller identity) of the task"), ("task_history", "Owner of the task")):
+        op.add_column(table, sa.Column("owner_id", sa.Text(), server_default=LEGACY_OWNER_ID, nullable=False, comment=comment))
+        op.alter_column(table, "owner_id", server_default=None)
+
+    op.create_index("ix_todo_tasks_owner_id_created_at_id", "todo_tasks", ["owner_id", "created_at", "id"], unique=False)
+    op.create_index(
+        "ix_todo_tasks_owner_id_status_created_at_id",
+        "todo_tasks",
+        ["owner_id", "status", "created_at", "id"],
+        unique=False,
+    )
+
+    op.drop_index("ix_task_history_record_id_id", table_name="task_history")
+    op.create_index("ix_task_history_owner_id_record_id_id", "task_history", ["owner_id", "record_id", "id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_task_history_owner_id_record_id_id", table_name="task_history")
+    op.create_index("ix_task_history_record_id_id", "task_history", ["record_id", "id"], unique=False)
+
+    op.drop_index("ix_todo_tasks_owner_id_status_created_at_id", table_name="todo_tasks")
+    op.drop_index("ix_todo_tasks_owner_id_created_at_id", table_name="todo_tasks")
+
+    op.drop_column("task_history", "owner_id")
+    op.drop_column("todo_tasks", "owner_id")
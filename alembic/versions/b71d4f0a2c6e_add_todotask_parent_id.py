@@ -0,0 +1,32 @@
+"""add todotask parent_id
+
+Revision ID: b71d4f0a2c6e
+Revises: 5e9a3c7d1b24
+Create Date: 2026-10-19 17:24:50.317206
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+# FIXME: mypy doesn't understand alembic imports
+from alembic import op  # type: ignore
+
+# revision identifiers, used by Alembic.
+revision: str = "b71d4f0a2c6e"
+down_revision: Union[str, None] = "5e9a3c7d1b24"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("todo_tasks", sa.Column("parent_id", sa.BigInteger(), nullable=True, comment="Parent task id"))
+    op.create_index(op.f("ix_todo_tasks_parent_id"), "todo_tasks", ["parent_id"], unique=False)
+    op.create_foreign_key("todo_tasks_parent_id_fkey", "todo_tasks", "todo_tasks", ["parent_id"], ["id"])
+
+
+def downgrade() -> None:
+    op.drop_constraint("todo_tasks_parent_id_fkey", "todo_tasks", type_="foreignkey")
+    op.drop_index(op.f("ix_todo_tasks_parent_id"), table_name="todo_tasks")
+    op.drop_column("todo_tasks", "parent_id")
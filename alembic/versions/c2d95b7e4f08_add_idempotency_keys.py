@@ -0,0 +1,47 @@
+"""add idempotency keys
+
+Revision ID: c2d95b7e4f08
+Revises: a93f6e2d8b15
+Create Date: 2026-10-19 21:05:47.238561
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+# FIXME: mypy doesn't understand alembic imports
+from alembic import op  # type: ignore
+
+# revision identifiers, used by Alembic.
+revision: str = "c2d95b7e4f08"
+down_revision: Union[str, None] = "a93f6e2d8b15"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "idempotency_keys",
+        sa.Column("owner_id", sa.Text(), nullable=False, comment="Owner (caller identity) of the key"),
+        sa.Column("key", sa.Text(), nullable=False, comment="Idempotency-Key header value"),
+        sa.Column(
+            "request_hash",
+            sa.Text(),
+            nullable=False,
+            comment="Hash of the request body, a key can't be reused for another body",
+        ),
+        sa.Column("status_code", sa.Integer(), nullable=True, comment="Status code of the stored response"),
+        sa.Column("response", sa.Text(), nullable=True, comment="Stored response body"),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, comment="Time of the first request"),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False, comment="Key is purged after this time"),
+        sa.Column("id", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("owner_id", "key"),
+    )
+    op.create_index(op.f("ix_idempotency_keys_expires_at"), "idempotency_keys", ["expires_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_idempotency_keys_expires_at"), table_name="idempotency_keys")
+    op.drop_table("idempotency_keys")
@@ -0,0 +1,47 @@
+"""add task history
+
+Revision ID: e4a81c5b9d37
+Revises: b71d4f0a2c6e
+Create Date: 2026-10-19 18:36:05.912744
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# FIXME: mypy doesn't understand alembic imports
+from alembic import op  # type: ignore
+
+# revision identifiers, used by Alembic.
+revision: str = "e4a81c5b9d37"
+down_revision: Union[str, None] = "b71d4f0a2c6e"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "task_history",
+        sa.Column("record_id", sa.BigInteger(), nullable=False, comment="Task id"),
+        sa.Column(
+            "action",
+            sa.Enum("CREATE", "UPDATE", "DELETE", name="historyaction"),
+            nullable=False,
+            comment="Change type",
+        ),
+        sa.Column("before", postgresql.JSONB(astext_type=sa.Text()), nullable=True, comment="Values before the change"),
+        sa.Column("after", postgresql.JSONB(astext_type=sa.Text()), nullable=True, comment="Values after the change"),
+        sa.Column("request_id", sa.Text(), nullable=True, comment="Request id of the change"),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, comment="Time of the change"),
+        sa.Column("id", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_task_history_record_id_id", "task_history", ["record_id", "id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_task_history_record_id_id", table_name="task_history")
+    op.drop_table("task_history")
+    sa.Enum(name="historyaction").drop(op.get_bind(), checkfirst=False)
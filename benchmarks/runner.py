@@ -0,0 +1,107 @@
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable
+
+
+@dataclass
+class BenchmarkResult:
+    """Throughput and latency percentiles of one scenario"""
+
+    name: str
+    ops: int
+    errors: int
+    seconds: float
+    throughput: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def percentile(latencies: list[float], pct: float) -> float:
+    """Nearest-rank percentile of sorted latencies"""
+    if not latencies:
+        return 0.0
+
+    index = max(0, min(len(latencies) - 1, round(pct / 100 * len(latencies)) - 1))
+    return latencies[index]
+
+
+def summarize(name: str, latencies: list[float], errors: int, seconds: float) -> BenchmarkResult:
+    """
+    Build scenario result
+
+    :param name: scenario name
+    :param latencies: latencies of successful operations in seconds
+    :param errors: number of failed operations
+    :param seconds: wall time of the scenario
+    """
+    latencies = sorted(latencies)
+
+    return BenchmarkResult(
+        name=name,
+        ops=len(latencies),
+        errors=errors,
+        seconds=seconds,
+        throughput=len(latencies) / seconds if seconds else 0.0,
+        p50_ms=percentile(latencies, 50) * 1000,
+        p95_ms=percentile(latencies, 95) * 1000,
+        p99_ms=percentile(latencies, 99) * 1000,
+    )
+
+
+async def measure(name: str, operation: Callable[[int], Awaitable[Any]], iterations: int) -> BenchmarkResult:
+    """
+    Run operation sequentially and measure every call
+
+    :param name: scenario name
+    :param operation: coroutine function taking the iteration number
+    :param iterations: number of calls
+    """
+    latencies: list[float] = []
+    errors = 0
+
+    started = time.perf_counter()
+
+    for i in range(iterations):
+        call_started = time.perf_counter()
+
+        try:
+            await operation(i)
+        except Exception:
+            errors += 1
+        else:
+            latencies.append(time.perf_counter() - call_started)
+
+    return summarize(name, latencies, errors, time.perf_counter() - started)
+
+
+def compare(results: dict[str, dict[str, Any]], baseline: dict[str, dict[str, Any]], threshold: float) -> list[str]:
+    """
+    Compare results with baseline
+
+    A scenario regresses if its throughput dropped or its p95 latency grew by more than ``threshold``.
+
+    :param results: current results by scenario name
+    :param baseline: baseline results by scenario name
+    :param threshold: allowed relative change, e.g. 0.1 for 10%
+
+    :return: list of regression descriptions
+    """
+    regressions = []
+
+    for name, base in baseline.items():
+        current = results.get(name)
+
+        if current is None:
+            continue
+
+        if current["throughput"] < base["throughput"] * (1 - threshold):
+            regressions.append(f"{name}: throughput {current['throughput']:.1f} ops/s < baseline {base['throughput']:.1f} ops/s")
+
+        if current["p95_ms"] > base["p95_ms"] * (1 + threshold):
+            regressions.append(f"{name}: p95 {current['p95_ms']:.2f} ms > baseline {base['p95_ms']:.2f} ms")
+
+    return regressions
@@ -0,0 +1,189 @@
+import asyncio
+import time
+from typing import Awaitable, Callable
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from main import app
+from src.api.v1.schamas import TodoTaskCreate, TodoTaskUpdate
+from src.core.audit import audit_writer
+from src.core.config import config
+from src.database.connection import SessionMaker
+from src.database.models import BaseModel, TodoTask
+from src.enums import TodoStatus
+from src.services import TodoTasksService
+
+from .runner import BenchmarkResult, measure, summarize
+
+# NOTE: all benchmark tasks belong to one owner, so list scenarios read every seeded task
+OWNER_ID = "benchmark"
+
+
+async def reset_database(engine: AsyncEngine, rows: int) -> list[int]:
+    """
+    Recreate tables and seed tasks
+
+    :param engine: benchmark engine
+    :param rows: number of tasks to seed
+
+    :return: ids of seeded tasks
+    """
+    async with engine.begin() as connection:
+        await connection.run_sync(BaseModel.metadata.drop_all)
+        await connection.run_sync(BaseModel.metadata.create_all)
+
+    async with SessionMaker() as session, session.begin():
+        tasks = [TodoTask(owner_id=OWNER_ID, title=f"title_{i}", description=f"description_{i}") for i in range(rows)]
+        session.add_all(tasks)
+        await session.flush()
+
+        return [task.id for task in tasks]
+
+
+async def run_service_scenarios(ids: list[int], iterations: int) -> list[BenchmarkResult]:
+    """CRUDService calls without HTTP, one session and transaction per call (as get_session does)"""
+    created: list[int] = []
+
+    async def get(i: int) -> None:
+        async with SessionMaker() as session, session.begin():
+            await TodoTasksService(session, OWNER_ID).get_by_id(ids[i % len(ids)])
+
+    async def get_all(_: int) -> None:
+        async with SessionMaker() as session, session.begin():
+            await TodoTasksService(session, OWNER_ID).get_all()
+
+    async def create(i: int) -> None:
+        async with SessionMaker() as session, session.begin():
+            task = await TodoTasksService(session, OWNER_ID).create(TodoTaskCreate(title=f"new_{i}", description="benchmark"))
+            created.append(task.id)
+
+    async def update(i: int) -> None:
+        async with SessionMaker() as session, session.begin():
+            data = TodoTaskUpdate(title=f"updated_{i}", description="benchmark", status=TodoStatus.IN_PROGRESS)
+            await TodoTasksService(session, OWNER_ID).update(ids[i % len(ids)], data)
+
+    async def delete(i: int) -> None:
+        async with SessionMaker() as session, session.begin():
+            await TodoTasksService(session, OWNER_ID).delete(created[i])
+
+    return [
+        await measure("service.get", get, iterations),
+        await measure("service.list", get_all, iterations),
+        await measure("service.create", create, iterations),
+        await measure("service.update", update, iterations),
+        await measure("service.delete", delete, iterations),
+    ]
+
+
+async def run_http_scenarios(client: AsyncClient, ids: list[int], iterations: int) -> list[BenchmarkResult]:
+    """Endpoints through the full ASGI stack, sequentially"""
+    created: list[int] = []
+
+    async def get(i: int) -> None:
+        response = await client.get(f"/api/v1/tasks/{ids[i % len(ids)]}")
+        response.raise_for_status()
+
+    async def get_all(_: int) -> None:
+        response = await client.get("/api/v1/tasks")
+        response.raise_for_status()
+
+    async def create(i: int) -> None:
+        response = await client.post("/api/v1/tasks", json={"title": f"new_{i}", "description": "benchmark"})
+        response.raise_for_status()
+        created.append(response.json()["id"])
+
+    async def update(i: int) -> None:
+        data = {"title": f"updated_{i}", "description": "benchmark", "status": "in_progress"}
+        response = await client.put(f"/api/v1/tasks/{ids[i % len(ids)]}", json=data)
+        response.raise_for_status()
+
+    async def delete(i: int) -> None:
+        response = await client.delete(f"/api/v1/tasks/{created[i]}")
+        response.raise_for_status()
+
+    return [
+        await measure("http.get", get, iterations),
+        await measure("http.list", get_all, iterations),
+        await measure("http.create", create, iterations),
+        await measure("http.update", update, iterations),
+        await measure("http.delete", delete, iterations),
+    ]
+
+
+async def run_load(name: str, request: Callable[[int], Awaitable[None]], requests: int, concurrency: int) -> BenchmarkResult:
+    """
+    Send ``requests`` requests from ``concurrency`` concurrent clients
+
+    :param name: scenario name
+    :param request: coroutine function sending one request, raises on failure
+    :param requests: total number of requests
+    :param concurrency: number of concurrent clients
+    """
+    latencies: list[float] = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def client_loop() -> None:
+        nonlocal errors
+
+        for i in counter:
+            started = time.perf_counter()
+
+            try:
+                await request(i)
+            except Exception:
+                errors += 1
+            else:
+                latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+
+    return summarize(name, latencies, errors, time.perf_counter() - started)
+
+
+async def run_load_scenarios(client: AsyncClient, ids: list[int], requests: int, concurrency: int) -> list[BenchmarkResult]:
+    """Concurrent load through the ASGI client"""
+
+    async def get(i: int) -> None:
+        response = await client.get(f"/api/v1/tasks/{ids[i % len(ids)]}")
+        response.raise_for_status()
+
+    async def get_all(_: int) -> None:
+        response = await client.get("/api/v1/tasks")
+        response.raise_for_status()
+
+    return [
+        await run_load(f"load.get.c{concurrency}", get, requests, concurrency),
+        await run_load(f"load.list.c{concurrency}", get_all, requests, concurrency),
+    ]
+
+
+async def run_all(engine: AsyncEngine, rows: int, iterations: int, requests: int, concurrency: int) -> list[BenchmarkResult]:
+    """Run all scenarios against the engine"""
+    # NOTE: the lifespan isn't run by ASGITransport, the app uses the benchmark engine directly
+    SessionMaker.configure(bind=engine)
+
+    # NOTE: list scenarios measure the query path, comparable with the baseline and service.list;
+    # with the response cache they would measure cache hits
+    config.LIST_CACHE_ENABLED = False
+
+    ids = await reset_database(engine, rows)
+    audit_writer.start(SessionMaker)
+
+    try:
+        results = await run_service_scenarios(ids, iterations)
+
+        async with AsyncClient(
+            transport=ASGITransport(app=app),
+            base_url="http://benchmark",
+            headers={config.OWNER_HEADER: OWNER_ID},
+        ) as client:
+            results += await run_http_scenarios(client, ids, iterations)
+            results += await run_load_scenarios(client, ids, requests, concurrency)
+
+    finally:
+        await audit_writer.stop()
+
+    return results
@@ -1,24 +1,66 @@
-import logging
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 
-from src.api import v1_router
+from src.api import system_router, v1_router
 from src.api.schemas import DefaultResponse
+from src.core.admission import admission
+from src.core.audit import audit_writer
 from src.core.config import ALLOWED_ORIGINS, config
-from src.core.exceptions import RecordNotFoundError
-
-logging.basicConfig(
-    level=config.LOG_LEVEL,
-    format="%(asctime)s - %(levelname)s - %(message)s",
+from src.core.exceptions import (
+    IdempotencyKeyInProgressError,
+    IdempotencyKeyReusedError,
+    PreconditionFailedError,
+    QuotaExceededError,
+    RecordNotFoundError,
+    ServiceOverloadedError,
+    TaskHasSubtasksError,
 )
+from src.core.lifecycle import lifecycle
+from src.core.log import setup_logging
+from src.database.connection import SessionMaker, create_engine, warm_up_engine
+from src.middleware import CancelOnDisconnectMiddleware, ProfilingMiddleware, RequestIdMiddleware, RequestTrackingMiddleware
+from src.services import idempotency_purger
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    # NOTE: configured per worker on startup, importing main (tests, tools) leaves logging alone
+    log_listener = setup_logging()
+
+    # NOTE: the engine is created here, i.e. per worker process and after fork
+    engine = create_engine()
+    SessionMaker.configure(bind=engine)
+
+    await warm_up_engine(engine, config.DB_POOL_WARMUP)
+    audit_writer.start(SessionMaker)
+    idempotency_purger.start(SessionMaker)
+    lifecycle.ready = True
+
+    # NOTE: uvicorn has installed its signal handlers by now, they are wrapped to flip readiness first
+    lifecycle.install_signal_handlers(config.SHUTDOWN_READINESS_DELAY)
+
+    yield
+
+    await lifecycle.drain(config.SHUTDOWN_DRAIN_TIMEOUT)
+    await idempotency_purger.stop()
+
+    # NOTE: write buffered audit history while the engine is still there
+    await audit_writer.stop()
+    await engine.dispose()
+
+    # NOTE: flush queued log records before the worker exits
+    log_listener.stop()
 
 
 app = FastAPI(
     title="Todo API",
     version="1.0.0",
     description="API for managing todo tasks",
+    lifespan=lifespan,
 )
 
 
@@ -31,7 +73,28 @@ app.add_middleware(
 )
 
 
+if config.CANCEL_ON_DISCONNECT:
+    app.add_middleware(CancelOnDisconnectMiddleware)
+
+
+# NOTE: added only when enabled, so profiling costs nothing on the hot path otherwise
+if config.PROFILING_ENABLED:
+    app.add_middleware(
+        ProfilingMiddleware,
+        header=config.PROFILING_HEADER,
+        sample_rate=config.PROFILING_SAMPLE_RATE,
+        output_dir=config.PROFILING_DIR,
+        profile_format=config.PROFILING_FORMAT,
+        interval=config.PROFILING_INTERVAL,
+    )
+
+
+app.add_middleware(RequestIdMiddleware)
+app.add_middleware(RequestTrackingMiddleware, lifecycle=lifecycle)
+
+
 app.include_router(v1_router)
+app.include_router(system_router)
 
 
 @app.exception_handler(RecordNotFoundError)
@@ -40,3 +103,64 @@ async def record_not_found_exception_handler(_, exc: RecordNotFoundError):
         status_code=404,
         content=DefaultResponse(success=False, message=str(exc)).model_dump(),
     )
+
+
+@app.exception_handler(PreconditionFailedError)
+async def precondition_failed_exception_handler(_, exc: PreconditionFailedError):
+    return JSONResponse(
+        status_code=412,
+        content=DefaultResponse(success=False, message=str(exc)).model_dump(),
+    )
+
+
+@app.exception_handler(QuotaExceededError)
+async def quota_exceeded_exception_handler(_, exc: QuotaExceededError):
+    return JSONResponse(
+        status_code=403,
+        content=DefaultResponse(success=False, message=str(exc)).model_dump(),
+    )
+
+
+@app.exception_handler(IdempotencyKeyReusedError)
+async def idempotency_key_reused_exception_handler(_, exc: IdempotencyKeyReusedError):
+    return JSONResponse(
+        status_code=422,
+        content=DefaultResponse(success=False, message=str(exc)).model_dump(),
+    )
+
+
+@app.exception_handler(IdempotencyKeyInProgressError)
+async def idempotency_key_in_progress_exception_handler(_, exc: IdempotencyKeyInProgressError):
+    return JSONResponse(
+        status_code=409,
+        content=DefaultResponse(success=False, message=str(exc)).model_dump(),
+        headers={"Retry-After": str(admission.retry_after)},
+    )
+
+
+@app.exception_handler(TaskHasSubtasksError)
+async def task_has_subtasks_exception_handler(_, exc: TaskHasSubtasksError):
+    return JSONResponse(
+        status_code=409,
+        content=DefaultResponse(success=False, message=str(exc)).model_dump(),
+    )
+
+
+@app.exception_handler(ServiceOverloadedError)
+async def service_overloaded_exception_handler(_, exc: ServiceOverloadedError):
+    return JSONResponse(
+        status_code=503,
+        content=DefaultResponse(success=False, message=str(exc)).model_dump(),
+        headers={"Retry-After": str(admission.retry_after)},
+    )
+
+
+@app.exception_handler(PoolTimeoutError)
+async def pool_timeout_exception_handler(_, exc: PoolTimeoutError):
+    # NOTE: no pool connection within DB_POOL_TIMEOUT - shed the request the same way as admission control
+    admission.pool_timeouts += 1
+    return JSONResponse(
+        status_code=503,
+        content=DefaultResponse(success=False, message="Database is overloaded, retry later").model_dump(),
+        headers={"Retry-After": str(admission.retry_after)},
+    )
@@ -0,0 +1,324 @@
+"""
+Synthetic data seeding for capacity testing
+
+Generates TodoTask rows and writes them through the fast bulk path of the database:
+COPY on Postgres, batched executemany on SQLite. Rows are generated in chunks that are
+distributed across processes; every chunk is committed together with its progress record,
+so an interrupted run continues from where it stopped when started again with the same --run-id
+and options (a resume with options that change the generated data is refused).
+
+    alembic upgrade head
+    python seed.py --rows 10000000 --workers 8
+    python seed.py --database-url sqlite:///./seed.db --rows 100000 --owners 100 --status-weights pending=6,in_progress=3,completed=1
+"""
+
+import argparse
+import csv
+import io
+import json
+import logging
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import Column, Engine, Integer, MetaData, String, Table, Text, create_engine, insert, select
+
+from src.core.config import PostgresEngineType, get_postgres_uri
+from src.database.models import TodoTask
+from src.enums import TodoStatus
+
+log = logging.getLogger("seed")
+
+WORDS = (
+    "alpha bravo charlie delta echo foxtrot golf hotel india juliet kilo lima mike november oscar papa "
+    "quebec romeo sierra tango uniform victor whiskey xray yankee zulu report deploy review fix write call"
+).split()
+
+# NOTE: progress lives in the seeded database, so a chunk and its progress record are committed atomically
+progress_metadata = MetaData()
+seed_progress = Table(
+    "seed_progress",
+    progress_metadata,
+    Column("run_id", String(64), primary_key=True),
+    Column("chunk", Integer, primary_key=True),
+    Column("rows", Integer, nullable=False),
+)
+# NOTE: options of the run that determine the generated data, a resume has to match them
+seed_runs = Table(
+    "seed_runs",
+    progress_metadata,
+    Column("run_id", String(64), primary_key=True),
+    Column("options", Text, nullable=False),
+)
+
+COLUMNS = ("owner_id", "title", "description", "status", "created_at", "updated_at")
+
+
+@dataclass(frozen=True)
+class SeedOptions:
+    database_url: str
+    run_id: str
+    rows: int
+    owners: int
+    chunk_size: int
+    batch_size: int
+    workers: int
+    status_weights: dict[TodoStatus, float]
+    title_length: int
+    description_length: int
+    days: int
+    seed: int
+    until: datetime
+
+    @property
+    def chunks(self) -> int:
+        return (self.rows + self.chunk_size - 1) // self.chunk_size
+
+    def data_options(self) -> str:
+        """Options the generated rows depend on (not the target, parallelism or batching), as JSON"""
+        return json.dumps(
+            {
+                "rows": self.rows,
+                "owners": self.owners,
+                "chunk_size": self.chunk_size,
+                "status_weights": {status.value: weight for status, weight in self.status_weights.items()},
+                "title_length": self.title_length,
+                "description_length": self.description_length,
+                "days": self.days,
+                "seed": self.seed,
+                "until": self.until.isoformat(),
+            },
+            sort_keys=True,
+        )
+
+
+class ResumeMismatchError(ValueError):
+    """The run was started with other data options"""
+
+
+def parse_status_weights(value: str) -> dict[TodoStatus, float]:
+    """Parse "pending=5,in_progress=3,completed=2" into status weights"""
+    weights = {}
+
+    for item in value.split(","):
+        name, weight = item.split("=")
+        weights[TodoStatus(name.strip())] = float(weight)
+
+    return weights
+
+
+def _text(rng: random.Random, length: int) -> str:
+    return " ".join(rng.choices(WORDS, k=length // 5 + 1))[:length]
+
+
+def generate_chunk(options: SeedOptions, chunk: int) -> list[dict[str, Any]]:
+    """
+    Generate rows of a chunk, deterministic for (seed, chunk) so a resumed run produces the same data
+
+    :param options: seed options
+    :param chunk: chunk number
+    """
+    rng = random.Random(f"{options.seed}:{chunk}")
+
+    statuses = list(options.status_weights)
+    weights = list(options.status_weights.values())
+    spread = options.days * 24 * 3600
+
+    size = min(options.chunk_size, options.rows - chunk * options.chunk_size)
+    rows = []
+
+    for status in rng.choices(statuses, weights, k=size):
+        created_at = options.until - timedelta(seconds=rng.randrange(spread or 1))
+        updated_at = min(options.until, created_at + timedelta(seconds=rng.randrange(spread // 10 or 1)))
+
+        rows.append(
+            {
+                "owner_id": f"user-{rng.randrange(options.owners)}",
+                "title": _text(rng, options.title_length),
+                "description": _text(rng, options.description_length),
+                "status": status,
+                "created_at": created_at,
+                "updated_at": updated_at,
+            }
+        )
+
+    return rows
+
+
+def _write_postgres(engine: Engine, options: SeedOptions, chunk: int, rows: list[dict[str, Any]]) -> None:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    for row in rows:
+        # NOTE: Enum(TodoStatus) stores member names
+        writer.writerow(
+            (
+                row["owner_id"],
+                row["title"],
+                row["description"],
+                row["status"].name,
+                row["created_at"].isoformat(),
+                row["updated_at"].isoformat(),
+            )
+        )
+
+    buffer.seek(0)
+
+    connection = engine.raw_connection()
+
+    try:
+        cursor = connection.cursor()
+
+        try:
+            cursor.copy_expert(f"COPY {TodoTask.__tablename__} ({', '.join(COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buffer)
+            cursor.execute(
+                f"INSERT INTO {seed_progress.name} (run_id, chunk, rows) VALUES (%s, %s, %s)",
+                (options.run_id, chunk, len(rows)),
+            )
+        finally:
+            cursor.close()
+
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def _write_sqlite(engine: Engine, options: SeedOptions, chunk: int, rows: list[dict[str, Any]]) -> None:
+    with engine.begin() as connection:
+        for start in range(0, len(rows), options.batch_size):
+            connection.execute(insert(TodoTask), rows[start : start + options.batch_size])
+
+        connection.execute(insert(seed_progress).values(run_id=options.run_id, chunk=chunk, rows=len(rows)))
+
+
+_engines: dict[str, Engine] = {}
+
+
+def _get_engine(options: SeedOptions) -> Engine:
+    # NOTE: one engine per database and worker process, created after fork
+    if options.database_url not in _engines:
+        connect_args = {"timeout": 60} if options.database_url.startswith("sqlite") else {}
+        _engines[options.database_url] = create_engine(options.database_url, connect_args=connect_args)
+
+    return _engines[options.database_url]
+
+
+def seed_chunk(options: SeedOptions, chunk: int) -> int:
+    """
+    Generate and write one chunk with its progress record
+
+    :return: number of written rows
+    """
+    engine = _get_engine(options)
+    rows = generate_chunk(options, chunk)
+
+    if engine.dialect.name == "postgresql":
+        _write_postgres(engine, options, chunk, rows)
+    else:
+        _write_sqlite(engine, options, chunk, rows)
+
+    return len(rows)
+
+
+def seed(options: SeedOptions) -> int:
+    """
+    Seed missing chunks of the run
+
+    :return: number of rows written by this invocation
+    """
+    engine = create_engine(options.database_url)
+    progress_metadata.create_all(engine)
+
+    with engine.begin() as connection:
+        stored = connection.scalar(select(seed_runs.c.options).where(seed_runs.c.run_id == options.run_id))
+
+        if stored is None:
+            connection.execute(insert(seed_runs).values(run_id=options.run_id, options=options.data_options()))
+
+        elif stored != options.data_options():
+            engine.dispose()
+            raise ResumeMismatchError(
+                f"Run {options.run_id} was started with other options: {stored}, resume it with them or use another --run-id"
+            )
+
+        done = set(connection.scalars(select(seed_progress.c.chunk).where(seed_progress.c.run_id == options.run_id)))
+
+    # NOTE: don't let forked workers inherit open connections of the parent
+    engine.dispose()
+
+    pending = [chunk for chunk in range(options.chunks) if chunk not in done]
+    log.info("Run %s: %s of %s chunks done, %s to go", options.run_id, len(done), options.chunks, len(pending))
+
+    written = 0
+    started = time.perf_counter()
+
+    if options.workers == 1:
+        for chunk in pending:
+            written += seed_chunk(options, chunk)
+    else:
+        with ProcessPoolExecutor(max_workers=options.workers) as executor:
+            futures = [executor.submit(seed_chunk, options, chunk) for chunk in pending]
+
+            for future in as_completed(futures):
+                written += future.result()
+                log.info("%s rows written (%.0f rows/s)", written, written / (time.perf_counter() - started))
+
+    if engine.dialect.name == "postgresql" and written:
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.exec_driver_sql(f"ANALYZE {TodoTask.__tablename__}")
+
+    engine.dispose()
+    return written
+
+
+def parse_args() -> SeedOptions:
+    parser = argparse.ArgumentParser(description="Seed synthetic todo tasks for capacity testing")
+    parser.add_argument("--database-url", default=get_postgres_uri(PostgresEngineType.psycopg2), help="sync database URL")
+    parser.add_argument("--run-id", default="default", help="run id, rerun with the same id to resume")
+    parser.add_argument("--rows", type=int, required=True, help="total number of tasks")
+    parser.add_argument("--owners", type=int, default=1000, help="number of task owners (user-0 .. user-N), tasks are spread evenly")
+    parser.add_argument("--chunk-size", type=int, default=50_000, help="rows per chunk (unit of work and resume)")
+    parser.add_argument("--batch-size", type=int, default=5_000, help="rows per executemany batch on SQLite")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="number of processes")
+    parser.add_argument("--status-weights", type=parse_status_weights, default="pending=5,in_progress=3,completed=2")
+    parser.add_argument("--title-length", type=int, default=40, help="max title length")
+    parser.add_argument("--description-length", type=int, default=400, help="max description length")
+    parser.add_argument("--days", type=int, default=365, help="created_at is spread over this many days before --until")
+    parser.add_argument(
+        "--until",
+        type=lambda value: datetime.fromisoformat(value).replace(tzinfo=timezone.utc),
+        default=datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0),
+        help="latest timestamp, ISO format (default: today 00:00 UTC), keep it fixed when resuming",
+    )
+    parser.add_argument("--seed", type=int, default=42, help="random seed")
+    args = parser.parse_args()
+
+    return SeedOptions(
+        database_url=args.database_url,
+        run_id=args.run_id,
+        rows=args.rows,
+        owners=args.owners,
+        chunk_size=args.chunk_size,
+        batch_size=args.batch_size,
+        workers=args.workers,
+        status_weights=args.status_weights,
+        title_length=args.title_length,
+        description_length=args.description_length,
+        days=args.days,
+        seed=args.seed,
+        until=args.until,
+    )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    try:
+        seed(parse_args())
+    except ResumeMismatchError as e:
+        log.error("%s", e)
+        raise SystemExit(1) from None
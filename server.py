@@ -0,0 +1,63 @@
+"""
+Production entry point: multiple uvicorn workers with fork-safe engines
+
+Each worker imports ``main:app`` and creates its own engine in the app lifespan,
+so no connection is ever shared across processes. Pool size per worker is derived
+from DB_MAX_CONNECTIONS (see ``get_pool_limits``).
+"""
+
+import logging
+import os
+from importlib.util import find_spec
+
+import uvicorn
+
+from src.core.config import config, get_pool_limits, get_worker_count
+from src.core.log import setup_logging
+
+log = logging.getLogger(__name__)
+
+
+def main() -> None:
+    workers = get_worker_count()
+
+    # NOTE: workers re-read config from env, so every one of them sizes its pool for the same worker count
+    os.environ["APP_WORKERS"] = str(workers)
+
+    loop = "uvloop" if find_spec("uvloop") else "asyncio"
+    http = "httptools" if find_spec("httptools") else "h11"
+
+    pool_size, max_overflow = get_pool_limits()
+
+    # NOTE: the supervisor logs through the same queue listener as the workers
+    setup_logging()
+
+    if config.DB_MAX_CONNECTIONS and config.DB_MAX_CONNECTIONS < workers:
+        log.warning(
+            "DB_MAX_CONNECTIONS=%s is less than %s workers, each worker still needs a connection", config.DB_MAX_CONNECTIONS, workers
+        )
+
+    log.info(
+        "Starting %s workers (loop=%s, http=%s, pool_size=%s, max_overflow=%s per worker)",
+        workers,
+        loop,
+        http,
+        pool_size,
+        max_overflow,
+    )
+
+    uvicorn.run(
+        "main:app",
+        host=config.APP_HOST,
+        port=config.APP_PORT,
+        workers=workers,
+        loop=loop,
+        http=http,
+        timeout_graceful_shutdown=int(config.SHUTDOWN_DRAIN_TIMEOUT),
+        # NOTE: keep uvicorn from installing its own synchronous handlers, its loggers propagate to the root queue
+        log_config=None,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,7 @@
+from .system import router as system_router
 from .v1 import router as v1_router
 
 __all__ = [
+    "system_router",
     "v1_router",
 ]
@@ -0,0 +1,67 @@
+from typing import Any
+
+from fastapi import APIRouter, Response, status
+
+from src.core.admission import admission
+from src.core.audit import audit_writer
+from src.core.cache import response_cache
+from src.core.config import config
+from src.core.lifecycle import lifecycle
+from src.database.stats import statement_cache_stats
+
+from .schemas import DefaultResponse
+
+router = APIRouter(
+    tags=[
+        "system",
+    ],
+)
+
+
+@router.get("/readyz", status_code=status.HTTP_200_OK)
+async def readyz(response: Response) -> DefaultResponse:
+    """
+    Readiness probe: ready only after the connection pool is warmed up and until shutdown starts
+    """
+    if not lifecycle.ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return DefaultResponse(success=False, message="Not ready")
+
+    return DefaultResponse(success=True, message="Ready")
+
+
+@router.get("/metrics/admission", status_code=status.HTTP_200_OK)
+async def get_admission_metrics() -> dict[str, Any]:
+    """
+    Get admission control stats: shed counts, queue depth and in-flight requests per route
+    """
+    return admission.stats()
+
+
+@router.get("/metrics/statements", status_code=status.HTTP_200_OK)
+async def get_statement_metrics() -> dict[str, Any]:
+    """
+    Get SQLAlchemy compiled cache hit ratio and statement cache settings
+    """
+    return {
+        **statement_cache_stats.stats(),
+        "query_cache_size": config.DB_QUERY_CACHE_SIZE,
+        "prepared_statement_cache_size": config.DB_PREPARED_STATEMENT_CACHE_SIZE,
+        "asyncpg_statement_cache_size": config.DB_ASYNCPG_STATEMENT_CACHE_SIZE,
+    }
+
+
+@router.get("/metrics/cache", status_code=status.HTTP_200_OK)
+async def get_cache_metrics() -> dict[str, Any]:
+    """
+    Get list response cache stats
+    """
+    return response_cache.stats()
+
+
+@router.get("/metrics/audit", status_code=status.HTTP_200_OK)
+async def get_audit_metrics() -> dict[str, Any]:
+    """
+    Get audit history writer stats: buffered, written and rejected events
+    """
+    return audit_writer.stats()
@@ -1,13 +1,21 @@
-from typing import Annotated, Sequence
+from typing import Annotated, AsyncIterator, Sequence
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Header, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.core.cache import response_cache
+from src.core.config import config, is_list_cache_enabled
+from src.depends.admission import admit
+from src.depends.headers import get_if_match_version, make_etag
+from src.depends.identity import get_owner_id
 from src.depends.session import get_session
-from src.services import TodoTasksService
+from src.enums import TodoStatus
+from src.services import IdempotencyService, TaskHistoryService, TodoTasksService
 
 from ..schemas import DefaultResponse
-from .schamas import TodoTaskCreate, TodoTaskResponse, TodoTaskUpdate
+from .schamas import TaskHistoryResponse, TodoTaskCreate, TodoTaskResponse, TodoTaskTreeNode, TodoTaskUpdate
 
 router = APIRouter(
     prefix="/api/v1",
@@ -15,61 +23,206 @@ router = APIRouter(
         "todos",
         "v1",
     ],
+    dependencies=[Depends(admit)] if config.ADMISSION_ENABLED else [],
 )
 
+TASK_LIST_ADAPTER = TypeAdapter(list[TodoTaskResponse])
+
 
 @router.get("/tasks/{task_id}", status_code=status.HTTP_200_OK)
-async def get_task_by_id(task_id: int, session: Annotated[AsyncSession, Depends(get_session)]) -> TodoTaskResponse:
+async def get_task_by_id(
+    task_id: int,
+    response: Response,
+    owner_id: Annotated[str, Depends(get_owner_id)],
+    session: Annotated[AsyncSession, Depends(get_session)],
+) -> TodoTaskResponse:
+    """
+    Get task by id and return task (ETag header contains task version)
+    """
+    task = await TodoTasksService(session, owner_id).get_by_id(task_id)
+    response.headers["ETag"] = make_etag(task.version)
+    return task
+
+
+@router.get(
+    "/tasks/{task_id}/tree",
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+    responses={status.HTTP_200_OK: {"content": {"application/x-ndjson": {}}, "model": TodoTaskTreeNode}},
+)
+async def get_task_tree(
+    task_id: int,
+    owner_id: Annotated[str, Depends(get_owner_id)],
+    session: Annotated[AsyncSession, Depends(get_session)],
+    depth: Annotated[int, Query(ge=0, le=config.TASK_TREE_MAX_DEPTH)] = config.TASK_TREE_MAX_DEPTH,
+) -> StreamingResponse:
+    """
+    Get task with its subtasks as NDJSON, one TodoTaskTreeNode per line, parents before children
+
+    The whole subtree (up to ``depth`` levels) and per-node completion rollups come from
+    a single recursive query, rows are streamed as they are fetched.
+
+    :param task_id: root task id
+    :param depth: max depth of subtasks, 0 returns the task only
+    """
+    rows = await TodoTasksService(session, owner_id).get_tree(task_id, depth, config.TASK_TREE_BATCH_SIZE)
+
+    async def lines() -> AsyncIterator[bytes]:
+        async for row in rows:
+            yield TodoTaskTreeNode.model_validate(row._mapping).model_dump_json().encode() + b"\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@router.get("/tasks/{task_id}/history", status_code=status.HTTP_200_OK)
+async def get_task_history(
+    task_id: int,
+    owner_id: Annotated[str, Depends(get_owner_id)],
+    session: Annotated[AsyncSession, Depends(get_session)],
+    limit: Annotated[int, Query(ge=1, le=100)] = 50,
+    before: Annotated[int | None, Query(description="id of the last history row of the previous page")] = None,
+) -> list[TaskHistoryResponse]:
     """
-    Get task by id and return task
+    Get task change history, newest first (kept for deleted tasks too)
+
+    :param task_id: task id
+    :param limit: page size
+    :param before: id of the last history row of the previous page
+
+    :return: history page
     """
-    return await TodoTasksService(session).get_by_id(task_id)
+    return await TaskHistoryService(session, owner_id).get_page(task_id, limit, before)  # type: ignore
 
 
-@router.get("/tasks", status_code=status.HTTP_200_OK)
-async def get_tasks(session: Annotated[AsyncSession, Depends(get_session)]) -> Sequence[TodoTaskResponse]:
+@router.get("/tasks", status_code=status.HTTP_200_OK, response_model=Sequence[TodoTaskResponse])
+async def get_tasks(
+    request: Request,
+    owner_id: Annotated[str, Depends(get_owner_id)],
+    session: Annotated[AsyncSession, Depends(get_session)],
+    tags: Annotated[list[str] | None, Query()] = None,
+    task_status: Annotated[TodoStatus | None, Query(alias="status")] = None,
+) -> Response:
     """
-    Get all tasks
+    Get all tasks of the caller in creation order
+
+    ``?tags=a&tags=b`` returns only tasks having any of the tags, ``?status=`` only tasks with the status.
+
+    Serialized responses are cached by query parameters and the caller's generation,
+    so a hit skips both the list query and serialization (no database access at all).
     """
-    return await TodoTasksService(session).get_all()
+    service = TodoTasksService(session, owner_id)
+    key = None
+
+    if is_list_cache_enabled():
+        key = response_cache.make_key("tasks", service.get_generation(), request.query_params, owner_id)
+        content = response_cache.get(key)
+
+        if content is not None:
+            return Response(content, media_type="application/json")
+
+    content = TASK_LIST_ADAPTER.dump_json(TASK_LIST_ADAPTER.validate_python(await service.get_all(tags, task_status), from_attributes=True))
+
+    if key is not None:
+        response_cache.set(key, content)
+
+    return Response(content, media_type="application/json")
 
 
-@router.post("/tasks", status_code=status.HTTP_201_CREATED)
-async def create_task(data: TodoTaskCreate, session: Annotated[AsyncSession, Depends(get_session)]) -> TodoTaskResponse:
+# NOTE: write routes commit in a function scoped session, i.e. before the response is sent,
+# so a failed commit is an error response, not a 2xx (or a stored idempotent response) for a rolled back write
+@router.post("/tasks", status_code=status.HTTP_201_CREATED, response_model=TodoTaskResponse)
+async def create_task(
+    data: TodoTaskCreate,
+    response: Response,
+    owner_id: Annotated[str, Depends(get_owner_id)],
+    session: Annotated[AsyncSession, Depends(get_session, scope="function")],
+    idempotency_key: Annotated[str | None, Header(max_length=255)] = None,
+) -> Response | TodoTaskResponse:
     """
     Create new task and return created task
 
+    With the Idempotency-Key header the response is stored for IDEMPOTENCY_KEY_TTL seconds,
+    retries with the same key and body get it back (Idempotent-Replayed: true) without creating a task again.
+
     :param data: task data
+    :param idempotency_key: client generated key of the request
 
     :return: created task
     """
-    return await TodoTasksService(session).create(data)
+    service = TodoTasksService(session, owner_id)
+
+    if idempotency_key is None:
+        task = await service.create(data)
+        response.headers["ETag"] = make_etag(task.version)
+        return task
+
+    idempotency = IdempotencyService(session, owner_id)
+    stored = await idempotency.claim(idempotency_key, idempotency.get_request_hash(data.model_dump_json()))
+
+    if stored is not None:
+        # FIXME: mypy doesn't understand that stored keys have a response
+        content = stored.response.encode()  # type: ignore
+        return Response(
+            content,
+            status_code=stored.status_code,  # type: ignore
+            media_type="application/json",
+            headers={"ETag": make_etag(TodoTaskResponse.model_validate_json(content).version), "Idempotent-Replayed": "true"},
+        )
+
+    task = await service.create(data)
+    content = TodoTaskResponse.model_validate(task).model_dump_json().encode()
+    await idempotency.save(idempotency_key, status.HTTP_201_CREATED, content)
+
+    return Response(content, status_code=status.HTTP_201_CREATED, media_type="application/json", headers={"ETag": make_etag(task.version)})
 
 
 @router.put("/tasks/{task_id}", status_code=status.HTTP_200_OK)
-async def update_task(task_id: int, data: TodoTaskUpdate, session: Annotated[AsyncSession, Depends(get_session)]) -> TodoTaskResponse:
+async def update_task(
+    task_id: int,
+    data: TodoTaskUpdate,
+    response: Response,
+    owner_id: Annotated[str, Depends(get_owner_id)],
+    session: Annotated[AsyncSession, Depends(get_session, scope="function")],
+    version: Annotated[int | None, Depends(get_if_match_version)],
+) -> TodoTaskResponse:
     """
     Update task by id and return updated task
 
+    If the If-Match header is passed, the update is applied only when it matches
+    the current task version, otherwise 412 Precondition Failed is returned.
+
     :param task_id: task id
     :param data: task data
+    :param version: expected task version from If-Match header
 
     :return: updated task
     """
-    return await TodoTasksService(session).update(task_id, data)
+    task = await TodoTasksService(session, owner_id).update(task_id, data, version)
+    response.headers["ETag"] = make_etag(task.version)
+    return task
 
 
 @router.delete("/tasks/{task_id}")
-async def delete_task(task_id: int, session: Annotated[AsyncSession, Depends(get_session)]) -> DefaultResponse:
+async def delete_task(
+    task_id: int,
+    owner_id: Annotated[str, Depends(get_owner_id)],
+    session: Annotated[AsyncSession, Depends(get_session, scope="function")],
+    version: Annotated[int | None, Depends(get_if_match_version)],
+) -> DefaultResponse:
     """
     Delete task by id and return success status
 
+    If the If-Match header is passed, the task is deleted only when it matches
+    the current task version, otherwise 412 Precondition Failed is returned.
+
     :param task_id: task id
+    :param owner_id: caller identity
     :param session: database session
+    :param version: expected task version from If-Match header
 
     :return: success status
     """
-    res = await TodoTasksService(session).delete(task_id)
+    res = await TodoTasksService(session, owner_id).delete(task_id, version)
 
     return DefaultResponse(
         success=res,
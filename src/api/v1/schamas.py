@@ -1,6 +1,11 @@
-from pydantic import BaseModel
+from datetime import datetime
+from typing import Annotated, Any
 
-from src.enums import TodoStatus
+from pydantic import BaseModel, Field, StringConstraints, field_validator
+
+from src.enums import HistoryAction, TodoStatus
+
+TagName = Annotated[str, StringConstraints(strip_whitespace=True, min_length=1, max_length=64)]
 
 
 class BaseTodoTask(BaseModel):
@@ -12,14 +17,48 @@ class BaseTodoTask(BaseModel):
 class TodoTaskCreate(BaseModel):
     title: str
     description: str
+    parent_id: int | None = None
+    tags: list[TagName] = Field(default_factory=list, max_length=32)
 
 
 class TodoTaskUpdate(BaseTodoTask):
-    pass
+    # NOTE: None keeps current tags, a list replaces them
+    tags: list[TagName] | None = Field(default=None, max_length=32)
 
 
 class TodoTaskResponse(BaseTodoTask):
     id: int
+    version: int
+    parent_id: int | None = None
+    tags: list[str] = []
+
+    @field_validator("tags", mode="before")
+    @classmethod
+    def tag_names(cls, value: Any) -> Any:
+        return [getattr(tag, "name", tag) for tag in value]
+
+    class Config:
+        from_attributes = True
+
+
+class TodoTaskTreeNode(BaseTodoTask):
+    id: int
+    version: int
+    parent_id: int | None
+    depth: int
+    # NOTE: rollups over all descendants within the requested depth
+    subtasks: int
+    completed_subtasks: int
+
+
+class TaskHistoryResponse(BaseModel):
+    id: int
+    task_id: int = Field(validation_alias="record_id")
+    action: HistoryAction
+    before: dict[str, Any] | None
+    after: dict[str, Any] | None
+    request_id: str | None
+    created_at: datetime
 
     class Config:
         from_attributes = True
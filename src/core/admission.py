@@ -0,0 +1,157 @@
+import asyncio
+from collections import deque
+from typing import Any
+
+from src.core.config import config
+
+
+class AdmissionLimiter:
+    def __init__(self, name: str, limit: int, queue_size: int, queue_timeout: float) -> None:
+        """
+        Concurrency limiter with a bounded FIFO wait queue and a wait deadline
+
+        Requests over the limit wait in the queue at most ``queue_timeout`` seconds;
+        if the queue is full or the deadline expires the request is shed.
+
+        :param name: limiter name (route key)
+        :param limit: max number of concurrent requests
+        :param queue_size: max number of waiting requests
+        :param queue_timeout: max time in seconds a request may wait for a slot
+        """
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+
+        self.in_flight = 0
+        self.admitted = 0
+        self.shed = 0
+
+        self._waiters: deque[asyncio.Future[None]] = deque()
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> bool:
+        """
+        Acquire a slot
+
+        :return: True if the request is admitted, False if it must be shed
+        """
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return True
+
+        if len(self._waiters) >= self.queue_size:
+            self.shed += 1
+            return False
+
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+
+        except asyncio.TimeoutError:
+            self._abandon(waiter)
+            self.shed += 1
+            return False
+
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+
+        self.admitted += 1
+        return True
+
+    def _abandon(self, waiter: asyncio.Future[None]) -> None:
+        """Leave the wait queue, giving back the slot if it was handed over right before the deadline"""
+        if waiter.done():
+            self.release()
+        else:
+            waiter.cancel()
+            self._waiters.remove(waiter)
+
+    def release(self) -> None:
+        """Release a slot, handing it over to the oldest waiter if any"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+
+            if not waiter.done():
+                # NOTE: in_flight stays the same - the slot moves to the waiter
+                waiter.set_result(None)
+                return
+
+        self.in_flight -= 1
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "admitted": self.admitted,
+            "shed": self.shed,
+        }
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        default_limit: int,
+        route_limits: dict[str, int],
+        queue_size: int,
+        queue_timeout: float,
+        retry_after: int,
+    ) -> None:
+        """
+        Registry of per-route admission limiters
+
+        :param default_limit: concurrency limit for routes without explicit limit
+        :param route_limits: concurrency limits keyed by route key ("METHOD /path/{template}")
+        :param queue_size: max number of waiting requests per route
+        :param queue_timeout: max time in seconds a request may wait for a slot
+        :param retry_after: Retry-After value in seconds for shed requests
+        """
+        self.default_limit = default_limit
+        self.route_limits = route_limits
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+
+        # NOTE: requests shed because no pool connection was available in time
+        self.pool_timeouts = 0
+
+        self._limiters: dict[str, AdmissionLimiter] = {}
+
+    def get_limiter(self, route_key: str) -> AdmissionLimiter:
+        limiter = self._limiters.get(route_key)
+
+        if limiter is None:
+            limiter = AdmissionLimiter(
+                route_key,
+                self.route_limits.get(route_key, self.default_limit),
+                self.queue_size,
+                self.queue_timeout,
+            )
+            self._limiters[route_key] = limiter
+
+        return limiter
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "shed": sum(limiter.shed for limiter in self._limiters.values()),
+            "queue_depth": sum(limiter.queue_depth for limiter in self._limiters.values()),
+            "pool_timeouts": self.pool_timeouts,
+            "routes": {key: limiter.stats() for key, limiter in self._limiters.items()},
+        }
+
+
+admission = AdmissionController(
+    default_limit=config.ADMISSION_DEFAULT_LIMIT,
+    route_limits=config.ADMISSION_ROUTE_LIMITS,
+    queue_size=config.ADMISSION_QUEUE_SIZE,
+    queue_timeout=config.ADMISSION_QUEUE_TIMEOUT,
+    retry_after=config.ADMISSION_RETRY_AFTER,
+)
@@ -0,0 +1,306 @@
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime, timezone
+from itertools import groupby
+from typing import Any
+
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session, SessionTransaction
+
+from src.core.config import config
+from src.core.exceptions import ServiceOverloadedError
+from src.core.log import request_id_var
+
+log = logging.getLogger(__name__)
+
+# NOTE: events of the current transaction wait in Session.info until it's committed,
+# buffer slots reserved by the transaction are released when it ends (commit, rollback or close)
+SESSION_INFO_KEY = "audit_events"
+RESERVED_INFO_KEY = "audit_reserved"
+
+AuditEvent = tuple[type[Any], dict[str, Any]]
+
+
+class AuditWriter:
+    def __init__(
+        self,
+        enabled: bool,
+        buffer_size: int,
+        batch_size: int,
+        flush_interval: float,
+        backpressure_timeout: float,
+        max_retries: int = 3,
+    ) -> None:
+        """
+        Buffered writer of audit history rows
+
+        Events are attached to the session and buffered only when its transaction commits,
+        a background task writes them with multi-row inserts every ``flush_interval`` seconds
+        or as soon as ``batch_size`` events are buffered. A failed batch stays buffered and is retried
+        up to ``max_retries`` times, then it's split in halves down to single rows and rows that still
+        fail are dead-lettered (logged and kept in ``dead_letters``), so one bad row never blocks the buffer.
+        When the buffer is full, writers wait for space (see ``wait_for_capacity``).
+
+        :param enabled: record events at all
+        :param buffer_size: max number of buffered and reserved events before writers are held back
+        :param batch_size: max number of rows per insert
+        :param flush_interval: max time in seconds an event stays buffered
+        :param backpressure_timeout: max time in seconds a writer waits for buffer space
+        :param max_retries: failed writes of a batch before it's split
+        """
+        self.enabled = enabled
+        self.buffer_size = buffer_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.backpressure_timeout = backpressure_timeout
+        self.max_retries = max_retries
+
+        self.written = 0
+        self.failed_flushes = 0
+        self.rejected = 0
+
+        self.dead_letters: deque[AuditEvent] = deque(maxlen=buffer_size)
+        self.dead_lettered = 0
+
+        self._buffer: deque[AuditEvent] = deque()
+        self._reserved = 0
+        self._attempts = 0
+        # NOTE: plain futures instead of asyncio.Condition - waiters may run in different event loops (tests)
+        self._waiters: deque[asyncio.Future] = deque()
+        self._session_maker: async_sessionmaker | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def buffered(self) -> int:
+        return len(self._buffer)
+
+    def record(self, session: AsyncSession, model: type[Any], values: dict[str, Any]) -> None:
+        """
+        Add an event to the session transaction: buffered on commit, discarded on rollback
+
+        :param session: session of the change
+        :param model: history model
+        :param values: history row values
+        """
+        values = {**values, "request_id": request_id_var.get(), "created_at": datetime.now(timezone.utc)}
+        session.info.setdefault(SESSION_INFO_KEY, []).append((model, values))
+
+    def _has_capacity(self) -> bool:
+        return len(self._buffer) + self._reserved < self.buffer_size
+
+    async def wait_for_capacity(self, session: AsyncSession) -> None:
+        """
+        Backpressure: reserve a buffer slot for one event of the session transaction,
+        wait until flush frees one if the buffer is full, raise ServiceOverloadedError on timeout
+
+        The slot is held until the transaction ends, so concurrent writers can't overshoot the buffer.
+
+        :param session: session of the change
+        """
+        if not self._has_capacity():
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + self.backpressure_timeout
+
+            while not self._has_capacity():
+                timeout = deadline - loop.time()
+
+                if timeout <= 0:
+                    self.rejected += 1
+                    raise ServiceOverloadedError("Audit history is behind, retry later")
+
+                waiter = loop.create_future()
+                self._waiters.append(waiter)
+
+                try:
+                    await asyncio.wait_for(waiter, timeout)
+                except asyncio.TimeoutError:
+                    pass
+                finally:
+                    if waiter in self._waiters:
+                        self._waiters.remove(waiter)
+
+        self._reserved += 1
+        session.info.setdefault(RESERVED_INFO_KEY, []).append(self)
+
+    def release(self) -> None:
+        """Release a slot reserved by ``wait_for_capacity``"""
+        self._reserved -= 1
+        self._notify()
+
+    def _notify(self) -> None:
+        """Wake up writers waiting for buffer space, they check for it again"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            waiter.get_loop().call_soon_threadsafe(_wake_up, waiter)
+
+    def enqueue(self, events: list[AuditEvent]) -> None:
+        """Buffer events of a committed transaction"""
+        self._buffer.extend(events)
+
+        if len(self._buffer) >= self.batch_size and self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def clear(self) -> None:
+        self._buffer.clear()
+        self._reserved = 0
+        self._attempts = 0
+        self.dead_letters.clear()
+        self._notify()
+
+    def start(self, session_maker: async_sessionmaker) -> None:
+        """
+        Start the background writer
+
+        :param session_maker: session maker bound to the engine
+        """
+        self._session_maker = session_maker
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background writer and flush buffered events"""
+        if self._task is not None:
+            self._task.cancel()
+
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+            self._task = None
+
+        await self.flush()
+
+        if self._buffer:
+            log.error("%s audit events were not written on shutdown", len(self._buffer))
+
+        self._loop = None
+        self._wakeup = None
+
+    async def _run(self) -> None:
+        # FIXME: mypy doesn't understand that wakeup is set in start
+        wakeup: asyncio.Event = self._wakeup  # type: ignore
+
+        while True:
+            try:
+                await asyncio.wait_for(wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+
+            wakeup.clear()
+            await self.flush()
+
+    async def _write(self, batch: list[AuditEvent]) -> None:
+        # FIXME: mypy doesn't understand that session maker is checked in flush
+        async with self._session_maker() as session, session.begin():  # type: ignore
+            # NOTE: one executemany per model, SQLAlchemy sends it as multi-row INSERT ... VALUES
+            for model, events in groupby(batch, key=lambda item: item[0]):
+                await session.execute(insert(model), [values for _, values in events])
+
+    async def _write_split(self, batch: list[AuditEvent]) -> int:
+        """
+        Write a batch that keeps failing in halves, dead-letter single rows that still fail
+
+        :return: number of written events
+        """
+        try:
+            await self._write(batch)
+            return len(batch)
+
+        except Exception:
+            if len(batch) > 1:
+                middle = len(batch) // 2
+                return await self._write_split(batch[:middle]) + await self._write_split(batch[middle:])
+
+            log.exception("Dead-lettered audit event: %s", batch[0][1])
+            self.dead_letters.extend(batch)
+            self.dead_lettered += 1
+            return 0
+
+    async def flush(self) -> int:
+        """
+        Write buffered events in batches
+
+        A failed batch stays buffered for the next flush, after ``max_retries`` failures it's split
+        and its failing rows are dead-lettered.
+
+        :return: number of written events
+        """
+        written = 0
+
+        while self._buffer and self._session_maker is not None:
+            batch = [self._buffer[i] for i in range(min(self.batch_size, len(self._buffer)))]
+
+            if self._attempts < self.max_retries:
+                try:
+                    await self._write(batch)
+
+                except Exception:
+                    self._attempts += 1
+                    self.failed_flushes += 1
+                    log.exception("Failed to write %s audit events (attempt %s of %s)", len(batch), self._attempts, self.max_retries)
+                    break
+
+                written += len(batch)
+            else:
+                written += await self._write_split(batch)
+
+            self._attempts = 0
+
+            for _ in batch:
+                self._buffer.popleft()
+
+            self._notify()
+
+        self.written += written
+        return written
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "buffered": self.buffered,
+            "written": self.written,
+            "failed_flushes": self.failed_flushes,
+            "rejected": self.rejected,
+            "dead_lettered": self.dead_lettered,
+        }
+
+
+audit_writer = AuditWriter(
+    enabled=config.AUDIT_ENABLED,
+    buffer_size=config.AUDIT_BUFFER_SIZE,
+    batch_size=config.AUDIT_BATCH_SIZE,
+    flush_interval=config.AUDIT_FLUSH_INTERVAL,
+    backpressure_timeout=config.AUDIT_BACKPRESSURE_TIMEOUT,
+    max_retries=config.AUDIT_MAX_RETRIES,
+)
+
+
+def _wake_up(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+@event.listens_for(Session, "after_commit")
+def _buffer_committed_events(session: Session) -> None:
+    events = session.info.pop(SESSION_INFO_KEY, None)
+
+    if events:
+        audit_writer.enqueue(events)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_events(session: Session) -> None:
+    session.info.pop(SESSION_INFO_KEY, None)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _release_reserved_slots(session: Session, transaction: SessionTransaction) -> None:
+    # NOTE: after_commit has buffered the events already, savepoints don't end the transaction
+    if transaction.parent is None:
+        for writer in session.info.pop(RESERVED_INFO_KEY, ()):
+            writer.release()
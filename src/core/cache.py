@@ -0,0 +1,181 @@
+import time
+from collections import OrderedDict
+from itertools import count
+from typing import Any, Hashable, Mapping
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.datastructures import QueryParams
+
+from src.core.config import config
+
+# NOTE: generations to bump wait in Session.info until the transaction is committed
+SESSION_INFO_KEY = "generation_bumps"
+
+
+class Generations:
+    def __init__(self, max_entries: int) -> None:
+        """
+        In-process generation counters per (namespace, owner), bumped after a write commits
+
+        Reading a generation never touches the database and writes never share a counter row.
+        Every bump takes a new value of one process-wide sequence, and owners evicted from the LRU
+        fall back to the highest evicted value, so a generation never repeats for an owner
+        and a stale cached response can't be read again. Other workers don't see the bump,
+        their cached responses expire after the cache TTL.
+
+        :param max_entries: max number of tracked counters
+        """
+        self.max_entries = max_entries
+
+        self._sequence = count(1)
+        self._generations: OrderedDict[Hashable, int] = OrderedDict()
+        self._floor = 0
+
+    def get(self, namespace: str, owner: Hashable = None) -> int:
+        """
+        Get current generation
+
+        :param namespace: cache namespace (e.g. table name)
+        :param owner: owner the data is scoped to
+        """
+        return self._generations.get((namespace, owner), self._floor)
+
+    def bump(self, namespace: str, owner: Hashable = None) -> None:
+        """
+        Change generation, invalidates cached responses of the owner
+
+        :param namespace: cache namespace (e.g. table name)
+        :param owner: owner the data is scoped to
+        """
+        key = (namespace, owner)
+
+        self._generations.pop(key, None)
+        self._generations[key] = next(self._sequence)
+
+        while len(self._generations) > self.max_entries:
+            _, evicted = self._generations.popitem(last=False)
+            self._floor = max(self._floor, evicted)
+
+    def bump_on_commit(self, session: AsyncSession, namespace: str, owner: Hashable = None) -> None:
+        """
+        Bump generation when the session transaction commits, nothing happens on rollback
+
+        :param session: session of the write
+        :param namespace: cache namespace (e.g. table name)
+        :param owner: owner the data is scoped to
+        """
+        session.info.setdefault(SESSION_INFO_KEY, set()).add((namespace, owner))
+
+    def clear(self) -> None:
+        self._generations.clear()
+        self._floor = 0
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float) -> None:
+        """
+        LRU cache of pre-serialized responses bounded by entry count and total size
+
+        Keys include a generation (see ``Generations``), so bumping it invalidates all entries
+        of the owner in O(1); stale entries are never read again and age out of the LRU.
+        Entries also expire after ``ttl`` seconds, which bounds staleness across worker processes.
+
+        :param max_entries: max number of entries
+        :param max_bytes: max total size of cached bodies in bytes
+        :param ttl: max age of an entry in seconds, 0 - no expiry (single worker only)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._entries: OrderedDict[Hashable, tuple[float, bytes]] = OrderedDict()
+        self._size = 0
+
+    @staticmethod
+    def make_key(namespace: str, generation: int, params: QueryParams | Mapping[str, Any], *extra: Hashable) -> Hashable:
+        """
+        Build cache key from normalized query parameters
+
+        :param namespace: cache namespace (e.g. table name)
+        :param generation: current generation
+        :param params: query parameters, order of keys and repeated values doesn't matter
+        :param extra: additional key parts (e.g. caller identity)
+        """
+        items = params.multi_items() if isinstance(params, QueryParams) else params.items()
+
+        normalized: dict[str, list[str]] = {}
+        for name, value in items:
+            normalized.setdefault(name, []).append(str(value))
+
+        return (namespace, generation, tuple((name, tuple(sorted(values))) for name, values in sorted(normalized.items())), *extra)
+
+    def get(self, key: Hashable) -> bytes | None:
+        entry = self._entries.get(key)
+
+        if entry is not None and self.ttl and entry[0] <= time.monotonic():
+            self._entries.pop(key)
+            self._size -= len(entry[1])
+            entry = None
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Hashable, content: bytes) -> None:
+        if len(content) > self.max_bytes:
+            return
+
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._size -= len(previous[1])
+
+        self._entries[key] = (time.monotonic() + self.ttl, content)
+        self._size += len(content)
+
+        while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._size = 0
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+response_cache = ResponseCache(
+    max_entries=config.LIST_CACHE_MAX_ENTRIES,
+    max_bytes=config.LIST_CACHE_MAX_BYTES,
+    ttl=config.LIST_CACHE_TTL,
+)
+
+generations = Generations(max_entries=config.LIST_CACHE_MAX_ENTRIES)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_committed_generations(session: Session) -> None:
+    for namespace, owner in session.info.pop(SESSION_INFO_KEY, ()):
+        generations.bump(namespace, owner)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_generations(session: Session) -> None:
+    session.info.pop(SESSION_INFO_KEY, None)
@@ -1,3 +1,4 @@
+import os
 from enum import StrEnum
 
 from pydantic_settings import BaseSettings
@@ -11,6 +12,8 @@ class PostgresEngineType(StrEnum):
 class Config(BaseSettings):
     APP_HOST: str = "0.0.0.0"
     APP_PORT: int = 8000
+    # NOTE: number of worker processes, 0 - one per CPU (resolved by server.py)
+    APP_WORKERS: int = 1
 
     DB_HOST: str = "localhost"
     DB_PORT: int = 5432
@@ -18,7 +21,90 @@ class Config(BaseSettings):
     DB_PASSWORD: str = "postgres"
     DB_NAME: str = "postgres"
 
+    # NOTE: connection pool, requests waiting longer than DB_POOL_TIMEOUT get 503
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 5.0
+    # NOTE: global connection budget shared by all workers (keep below Postgres max_connections), 0 - no budget
+    DB_MAX_CONNECTIONS: int = 0
+    # NOTE: SQLAlchemy compiled cache size (per engine) and asyncpg prepared statement caches (per connection);
+    # set DB_ASYNCPG_STATEMENT_CACHE_SIZE=0 behind pgbouncer in transaction mode
+    DB_QUERY_CACHE_SIZE: int = 1200
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 500
+    DB_ASYNCPG_STATEMENT_CACHE_SIZE: int = 100
+    # NOTE: connections opened and warmed up on startup before /readyz reports ready
+    DB_POOL_WARMUP: int = 5
+
+    # NOTE: Postgres statement_timeout (ms) set once per connection, 0 disables it;
+    # per-route overrides are keyed by "METHOD /path/{template}" and set per transaction
+    DB_STATEMENT_TIMEOUT: int = 30000
+    DB_ROUTE_STATEMENT_TIMEOUTS: dict[str, int] = {}
+
+    # NOTE: cancel in-flight request handling (and DB queries) when the client disconnects
+    CANCEL_ON_DISCONNECT: bool = True
+
+    # NOTE: max time to wait for in-flight requests on shutdown before disposing the engine
+    SHUTDOWN_DRAIN_TIMEOUT: float = 10.0
+    # NOTE: time between a shutdown signal turning /readyz not-ready and the server closing its listeners,
+    # should exceed the load balancer health check interval (acts as a built-in pre-stop delay)
+    SHUTDOWN_READINESS_DELAY: float = 5.0
+
+    # NOTE: in-process cache of serialized list responses, invalidated by per-owner generations of this worker;
+    # writes in other workers are seen only after LIST_CACHE_TTL seconds (0 - never), so by default (None)
+    # it's enabled only with a single worker, where every write invalidates it at once (see is_list_cache_enabled)
+    LIST_CACHE_ENABLED: bool | None = None
+    LIST_CACHE_MAX_ENTRIES: int = 1024
+    LIST_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    LIST_CACHE_TTL: float = 1.0
+
+    # NOTE: header with the caller identity, tasks are scoped to it; max number of tasks per owner (0 - unlimited)
+    OWNER_HEADER: str = "X-User-ID"
+    TASKS_PER_OWNER_LIMIT: int = 10000
+
+    # NOTE: responses of POST /tasks with Idempotency-Key are replayed for IDEMPOTENCY_KEY_TTL seconds,
+    # expired keys are deleted by a background task in batches
+    IDEMPOTENCY_KEY_TTL: int = 24 * 3600
+    IDEMPOTENCY_PURGE_INTERVAL: float = 60.0
+    IDEMPOTENCY_PURGE_BATCH_SIZE: int = 1000
+
+    # NOTE: max depth of GET /tasks/{task_id}/tree (also guards the recursive CTE), rows fetched per batch while streaming
+    TASK_TREE_MAX_DEPTH: int = 32
+    TASK_TREE_BATCH_SIZE: int = 500
+
+    # NOTE: audit history is buffered in memory and written in batches by a background task;
+    # writes wait up to AUDIT_BACKPRESSURE_TIMEOUT for buffer space, then get 503;
+    # a batch failing AUDIT_MAX_RETRIES times is split and its failing rows are dead-lettered
+    AUDIT_ENABLED: bool = True
+    AUDIT_BUFFER_SIZE: int = 10000
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_INTERVAL: float = 1.0
+    AUDIT_BACKPRESSURE_TIMEOUT: float = 1.0
+    AUDIT_MAX_RETRIES: int = 3
+
     LOG_LEVEL: str = "INFO"
+    # NOTE: "json" or "text"; records go through a bounded queue (dropped when full)
+    # and DEBUG records are sampled with LOG_DEBUG_SAMPLE_RATE
+    LOG_FORMAT: str = "json"
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_DEBUG_SAMPLE_RATE: float = 1.0
+
+    # NOTE: on-demand profiling, requests are profiled if they have PROFILING_HEADER
+    # ("inline" - return the profile instead of the response, "file" - write to PROFILING_DIR, other values are ignored)
+    # or are picked by PROFILING_SAMPLE_RATE; PROFILING_FORMAT is "collapsed" or "html" (needs pyinstrument)
+    PROFILING_ENABLED: bool = False
+    PROFILING_HEADER: str = "X-Profile"
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_DIR: str = "profiles"
+    PROFILING_FORMAT: str = "collapsed"
+    PROFILING_INTERVAL: float = 0.001
+
+    # NOTE: admission control, per-route limits are keyed by "METHOD /path/{template}"
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_DEFAULT_LIMIT: int = 64
+    ADMISSION_ROUTE_LIMITS: dict[str, int] = {}
+    ADMISSION_QUEUE_SIZE: int = 128
+    ADMISSION_QUEUE_TIMEOUT: float = 1.0
+    ADMISSION_RETRY_AFTER: int = 1
 
     class Config:
         env_file = ".env"
@@ -34,3 +120,32 @@ ALLOWED_ORIGINS = [
 
 def get_postgres_uri(engine_type: PostgresEngineType) -> str:
     return f"postgresql+{engine_type}://{config.DB_USER}:{config.DB_PASSWORD}@{config.DB_HOST}:{config.DB_PORT}/{config.DB_NAME}"
+
+
+def get_worker_count() -> int:
+    """Get number of worker processes, APP_WORKERS=0 means one per CPU"""
+    return config.APP_WORKERS or os.cpu_count() or 1
+
+
+def is_list_cache_enabled() -> bool:
+    """Explicit LIST_CACHE_ENABLED, otherwise only with a single worker (read-your-writes across requests)"""
+    if config.LIST_CACHE_ENABLED is not None:
+        return config.LIST_CACHE_ENABLED
+
+    return get_worker_count() == 1
+
+
+def get_pool_limits() -> tuple[int, int]:
+    """
+    Get per-worker (pool_size, max_overflow)
+
+    With DB_MAX_CONNECTIONS set, the budget is split evenly between workers,
+    so pool_size + max_overflow of all workers never exceeds it.
+    """
+    if not config.DB_MAX_CONNECTIONS:
+        return config.DB_POOL_SIZE, config.DB_MAX_OVERFLOW
+
+    per_worker = max(1, config.DB_MAX_CONNECTIONS // get_worker_count())
+    pool_size = min(config.DB_POOL_SIZE, per_worker)
+
+    return pool_size, min(config.DB_MAX_OVERFLOW, per_worker - pool_size)
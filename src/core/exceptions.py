@@ -1,2 +1,26 @@
 class RecordNotFoundError(Exception):
     pass
+
+
+class PreconditionFailedError(Exception):
+    pass
+
+
+class TaskHasSubtasksError(Exception):
+    pass
+
+
+class ServiceOverloadedError(Exception):
+    pass
+
+
+class QuotaExceededError(Exception):
+    pass
+
+
+class IdempotencyKeyReusedError(Exception):
+    pass
+
+
+class IdempotencyKeyInProgressError(Exception):
+    pass
@@ -0,0 +1,79 @@
+import asyncio
+import logging
+import signal
+import threading
+from types import FrameType
+from typing import Any
+
+log = logging.getLogger(__name__)
+
+
+class Lifecycle:
+    def __init__(self) -> None:
+        """
+        Application lifecycle state: readiness and in-flight requests to drain on shutdown
+        """
+        self.ready = False
+        self.in_flight = 0
+
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    def request_started(self) -> None:
+        self.in_flight += 1
+        self._idle.clear()
+
+    def request_finished(self) -> None:
+        self.in_flight -= 1
+
+        if not self.in_flight:
+            self._idle.set()
+
+    def install_signal_handlers(self, delay: float, signals: tuple[int, ...] = (signal.SIGINT, signal.SIGTERM)) -> None:
+        """
+        Stop being ready as soon as a shutdown signal arrives and pass it on to the server after ``delay``
+
+        The server closes its listeners right after the signal, so without the delay load balancers
+        never see /readyz failing and keep routing new connections to a closing worker.
+        A second signal is passed on at once. Must be called after the server installed its handlers.
+
+        :param delay: time in seconds between not-ready and the actual shutdown, 0 disables it
+        :param signals: signals to intercept
+        """
+        if delay <= 0 or threading.current_thread() is not threading.main_thread():
+            return
+
+        loop = asyncio.get_running_loop()
+
+        for sig in signals:
+            previous = signal.getsignal(sig)
+
+            if not callable(previous):
+                continue
+
+            def handler(sig: int, frame: FrameType | None, previous: Any = previous) -> None:
+                if not self.ready:
+                    previous(sig, frame)
+                    return
+
+                log.info("Received signal %s, not ready, shutting down in %s s", sig, delay)
+                self.ready = False
+                loop.call_soon_threadsafe(loop.call_later, delay, previous, sig, frame)
+
+            signal.signal(sig, handler)
+
+    async def drain(self, timeout: float) -> None:
+        """
+        Stop being ready and wait for in-flight requests to finish
+
+        :param timeout: max time in seconds to wait
+        """
+        self.ready = False
+
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+        except asyncio.TimeoutError:
+            log.warning("Shutdown drain timed out with %s requests in flight", self.in_flight)
+
+
+lifecycle = Lifecycle()
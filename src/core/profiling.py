@@ -0,0 +1,100 @@
+import logging
+import sys
+import threading
+from collections import Counter
+from types import FrameType
+
+log = logging.getLogger(__name__)
+
+try:
+    # FIXME: pyinstrument is an optional dependency without stubs
+    from pyinstrument import Profiler as PyinstrumentProfiler  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover - optional dependency
+    PyinstrumentProfiler = None  # type: ignore
+
+
+class StackSampler:
+    content_type = "text/plain; charset=utf-8"
+    extension = "collapsed"
+
+    def __init__(self, interval: float) -> None:
+        """
+        Sampling profiler of the current thread producing collapsed stacks (flamegraph.pl / speedscope format)
+
+        A background thread takes a stack snapshot of the profiled thread every ``interval`` seconds,
+        time spent waiting for the database shows up as the event loop's selector frames.
+
+        :param interval: sampling interval in seconds
+        """
+        self.interval = interval
+        self.samples: Counter[str] = Counter()
+
+        self._thread_id = threading.get_ident()
+        self._stopped = threading.Event()
+        self._sampler = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._sampler.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._sampler.join()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+
+            if frame is not None:
+                self.samples[self._collapse(frame)] += 1
+
+    @staticmethod
+    def _collapse(frame: FrameType | None) -> str:
+        stack = []
+
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+            frame = frame.f_back
+
+        return ";".join(reversed(stack))
+
+    def render(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+class HTMLProfiler:
+    content_type = "text/html; charset=utf-8"
+    extension = "html"
+
+    def __init__(self, interval: float) -> None:
+        """
+        pyinstrument profiler with HTML output, follows awaits across tasks
+
+        :param interval: sampling interval in seconds
+        """
+        self._profiler = PyinstrumentProfiler(interval=interval, async_mode="enabled")
+
+    def start(self) -> None:
+        self._profiler.start()
+
+    def stop(self) -> None:
+        self._profiler.stop()
+
+    def render(self) -> str:
+        return self._profiler.output_html()
+
+
+def create_profiler(profile_format: str, interval: float) -> StackSampler | HTMLProfiler:
+    """
+    Create profiler for the output format
+
+    :param profile_format: "collapsed" or "html" (requires pyinstrument, falls back to collapsed)
+    :param interval: sampling interval in seconds
+    """
+    if profile_format == "html":
+        if PyinstrumentProfiler is not None:
+            return HTMLProfiler(interval)
+
+        log.warning("pyinstrument is not installed, falling back to collapsed stacks")
+
+    return StackSampler(interval)
@@ -0,0 +1,21 @@
+from typing import Callable
+
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+INSERTS: dict[str, Callable] = {
+    "postgresql": postgresql_insert,
+    "sqlite": sqlite_insert,
+}
+
+
+def get_insert(session: AsyncSession) -> Callable:
+    """
+    Get dialect-specific insert() of the session bind, supports ON CONFLICT
+
+    :param session: SQLAlchemy session
+
+    :return: insert construct factory
+    """
+    return INSERTS[session.get_bind().dialect.name]
@@ -1,6 +1,6 @@
-from typing import Any, Generic, Sequence, Type, TypeVar
+from typing import Any, Callable, Generic, Hashable, Mapping, Sequence, Type, TypeVar
 
-from sqlalchemy import ScalarResult, select
+from sqlalchemy import Executable, ScalarResult, bindparam, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import DeclarativeBase
 
@@ -8,17 +8,48 @@ from .base import ABCRepo
 
 M = TypeVar("M", bound=DeclarativeBase)
 
+# NOTE: statements are built once per (model, operation) and reused; a reused construct
+# keeps its memoized cache key, so SQLAlchemy goes straight to the compiled cache
+_statement_cache: dict[tuple[Hashable, ...], Executable] = {}
+
 
 class Repository(ABCRepo, Generic[M]):
-    def __init__(self, model: Type[M], session: AsyncSession) -> None:
+    def __init__(self, model: Type[M], session: AsyncSession, scope: Mapping[str, Any] | None = None) -> None:
         """
         Generic repository class for CRUD operations
 
         :param model: SQLAlchemy model class
         :param session: SQLAlchemy session
+        :param scope: field values every query is restricted to and every created model gets
+            (e.g. ``{"owner_id": ...}``), models outside the scope behave as missing
         """
         self._model: Type[M] = model
         self._session: AsyncSession = session
+        self._scope: dict[str, Any] = dict(scope or {})
+
+    @property
+    def scope(self) -> dict[str, Any]:
+        return self._scope
+
+    def _in_scope(self, model: M) -> bool:
+        return all(getattr(model, field) == value for field, value in self._scope.items())
+
+    def _statement(self, key: tuple[Hashable, ...], factory: Callable[[], Executable]) -> Executable:
+        """
+        Get cached statement for the model or build and cache it
+
+        :param key: operation key, must identify the statement shape (not the values)
+        :param factory: statement builder, parameters must be bindparams
+
+        :return: statement
+        """
+        cache_key = (self._model, *key)
+        statement = _statement_cache.get(cache_key)
+
+        if statement is None:
+            statement = _statement_cache[cache_key] = factory()
+
+        return statement
 
     async def get_by_pk(self, pk: int | str | Any) -> M | None:
         """
@@ -28,18 +59,27 @@ class Repository(ABCRepo, Generic[M]):
 
         :return: model or None
         """
-        return await self._session.get(self._model, pk)
+        model = await self._session.get(self._model, pk)
 
-    async def all(self) -> Sequence[M] | M:
+        if model is not None and not self._in_scope(model):
+            return None
+
+        return model
+
+    async def all(self) -> Sequence[M]:
         """
         Get all models
 
         :return: list of models
         """
-        result = await self._session.execute(select(self._model))
+        if self._scope:
+            return (await self.filter()).all()
+
+        statement = self._statement(("all",), lambda: select(self._model))
+        result = await self._session.execute(statement)
         return result.scalars().all()
 
-    async def filter(self, **kwargs) -> ScalarResult[M] | M:
+    async def filter(self, **kwargs) -> ScalarResult[M]:
         """
         Get models by filter parameters (synonyms: filter_by in SQLAlchemy)
 
@@ -47,9 +87,69 @@ class Repository(ABCRepo, Generic[M]):
 
         :return: list of models
         """
-        result = await self._session.execute(select(self._model).filter_by(**kwargs))
+        kwargs = {**kwargs, **self._scope}
+
+        # NOTE: None values become IS NULL (as in filter_by) and are part of the statement shape
+        fields = tuple(sorted(field for field, value in kwargs.items() if value is not None))
+        null_fields = tuple(sorted(field for field, value in kwargs.items() if value is None))
+
+        statement = self._statement(
+            ("filter", fields, null_fields),
+            lambda: select(self._model).where(
+                *(getattr(self._model, field) == bindparam(f"filter_{field}") for field in fields),
+                *(getattr(self._model, field).is_(None) for field in null_fields),
+            ),
+        )
+        result = await self._session.execute(statement, {f"filter_{field}": kwargs[field] for field in fields})
         return result.scalars()
 
+    async def where(
+        self,
+        *clauses: Any,
+        order_by: Sequence[Any] = (),
+        key: Hashable | None = None,
+        params: Mapping[str, Any] | None = None,
+    ) -> Sequence[M]:
+        """
+        Get models by arbitrary where clauses (synonyms: select().where() in SQLAlchemy)
+
+        :param clauses: SQLAlchemy where clauses
+        :param order_by: SQLAlchemy order by clauses
+        :param key: statement shape key, if set the statement is built once and reused (see ``_statement``),
+            so clauses must not embed values: use bindparams and pass the values in ``params``
+        :param params: bindparam values
+
+        :return: list of models
+        """
+        fields = tuple(sorted(self._scope))
+
+        def factory() -> Executable:
+            scope = (getattr(self._model, field) == bindparam(f"scope_{field}") for field in fields)
+            return select(self._model).where(*scope, *clauses).order_by(*order_by)
+
+        statement = factory() if key is None else self._statement(("where", key, fields), factory)
+        result = await self._session.execute(statement, {**{f"scope_{field}": self._scope[field] for field in fields}, **(params or {})})
+        return result.scalars().all()
+
+    async def count(self) -> int:
+        """
+        Count models in the scope
+
+        :return: number of models
+        """
+        fields = tuple(sorted(self._scope))
+
+        statement = self._statement(
+            ("count", fields),
+            lambda: (
+                select(func.count())
+                .select_from(self._model)
+                .where(*(getattr(self._model, field) == bindparam(f"scope_{field}") for field in fields))
+            ),
+        )
+        result = await self._session.execute(statement, {f"scope_{field}": self._scope[field] for field in fields})
+        return result.scalar_one()
+
     async def create(self, model: M) -> M:
         """
         Create new model
@@ -58,6 +158,9 @@ class Repository(ABCRepo, Generic[M]):
 
         :return: created model
         """
+        for field, value in self._scope.items():
+            setattr(model, field, value)
+
         self._session.add(model)
         await self._session.flush()
         return model
@@ -83,6 +186,7 @@ class Repository(ABCRepo, Generic[M]):
         :return: None
         """
         await self._session.delete(model)
+        await self._session.flush()
 
     async def commit(self) -> None:
         """Commit changes (synonyms: session.commit() in SQLAlchemy)"""
@@ -0,0 +1,12 @@
+from fastapi import Request
+
+
+def get_route_key(request: Request) -> str:
+    """
+    Get route key ("METHOD /path/{template}") of the matched route
+
+    :param request: routed request
+
+    :return: route key
+    """
+    return f"{request.method} {request.scope['route'].path}"
@@ -1,12 +1,19 @@
 import logging
-from typing import Generic, Sequence, Type, TypeVar
+from datetime import datetime, timezone
+from typing import Any, Generic, NoReturn, Sequence, Type, TypeVar
 
 from pydantic import BaseModel
+from pydantic_core import to_jsonable_python
+from sqlalchemy import inspect
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.exc import StaleDataError
 
-from src.core.exceptions import RecordNotFoundError
+from src.core.audit import audit_writer
+from src.core.cache import generations
+from src.core.exceptions import PreconditionFailedError, RecordNotFoundError
 from src.core.repo.generic import M, Repository
+from src.enums import HistoryAction
 
 from .base import BaseSessionService
 
@@ -30,15 +37,93 @@ class CRUDService(BaseSessionService, Generic[M, C, U]):
     CREATE_MODE: Type[C]
     UPDATE_MODEL: Type[U]
 
-    def __init__(self, session: AsyncSession) -> None:
+    # NOTE: if set every committed write bumps the in-process generation of the table and owner
+    # (used to invalidate cached responses, see src.core.cache)
+    TRACK_GENERATION: bool = False
+
+    # NOTE: optional audit history model, if set every write records before/after values
+    # (written asynchronously in batches, see src.core.audit)
+    HISTORY_MODEL: Type[Any] | None = None
+
+    # NOTE: optional owner field, if set every query and write is scoped to the owner passed to the service
+    OWNER_FIELD: str | None = None
+
+    def __init__(self, session: AsyncSession, owner_id: Any = None) -> None:
         super().__init__(session)
 
-        self._repo = Repository(self.DB_MODEL, session)
+        if self.OWNER_FIELD is not None and owner_id is None:
+            raise ValueError(f"{type(self).__name__} is scoped by {self.OWNER_FIELD}, owner_id is required")
+
+        self.owner_id = owner_id
 
-    def _raise_not_found(self, _id: int) -> None:
+        self._repo = Repository(self.DB_MODEL, session, {self.OWNER_FIELD: owner_id} if self.OWNER_FIELD else None)
+
+    def _raise_not_found(self, _id: int) -> NoReturn:
         """Raise not found exception"""
         raise RecordNotFoundError(f"Record {self.DB_MODEL.__name__} with id={_id} not found")
 
+    def _raise_precondition_failed(self, _id: int) -> NoReturn:
+        """Raise precondition failed exception"""
+        raise PreconditionFailedError(f"Record {self.DB_MODEL.__name__} with id={_id} was modified concurrently")
+
+    def _bump_generation(self) -> None:
+        """Bump generation of the table and owner once the write is committed"""
+        if self.TRACK_GENERATION:
+            generations.bump_on_commit(self._session, self.DB_MODEL.__tablename__, self.owner_id)
+
+    def get_generation(self) -> int:
+        """Get generation of the table and owner, changes on every committed write through the service (no IO)"""
+        return generations.get(self.DB_MODEL.__tablename__, self.owner_id)
+
+    @property
+    def _history_enabled(self) -> bool:
+        return self.HISTORY_MODEL is not None and audit_writer.enabled
+
+    def _snapshot(self, record: M) -> dict[str, Any]:
+        """Get JSON-compatible column values of the record for history (only loaded ones, no IO)"""
+        state = inspect(record)
+        return to_jsonable_python({prop.key: state.dict[prop.key] for prop in state.mapper.column_attrs if prop.key in state.dict})
+
+    async def _wait_for_history(self) -> None:
+        """Hold the write back while the audit history buffer is full"""
+        if self._history_enabled:
+            await audit_writer.wait_for_capacity(self._session)
+
+    def _record_history(self, action: HistoryAction, _id: int, before: dict[str, Any] | None, after: dict[str, Any] | None) -> None:
+        """Record history event, it's written only if the transaction commits"""
+        if self._history_enabled:
+            audit_writer.record(
+                self._session,
+                self.HISTORY_MODEL,  # type: ignore
+                {**self._repo.scope, "record_id": _id, "action": action, "before": before, "after": after},
+            )
+
+    async def _get_model_data(self, data: C | U) -> dict[str, Any]:
+        """
+        Get model field values from pydantic model
+
+        Override to resolve relations (e.g. names into related models) before create and update.
+        """
+        return data.model_dump()
+
+    @staticmethod
+    def _touch_on_relationship_change(record: M) -> None:
+        """
+        Set ``updated_at`` of the record if its relationships changed
+
+        Collection changes (e.g. many-to-many) are written to other tables and don't UPDATE
+        the row itself, so neither ``updated_at`` nor ``version_id_col`` (and ETag) would change.
+        Setting ``updated_at`` makes the row dirty, so the versioned UPDATE bumps the version too.
+        """
+        state = inspect(record)
+
+        if "updated_at" not in state.mapper.column_attrs:
+            return
+
+        if any(state.attrs[rel.key].history.has_changes() for rel in state.mapper.relationships):
+            # FIXME: mypy doesn't understand that the model has updated_at
+            record.updated_at = datetime.now(timezone.utc)  # type: ignore
+
     async def _create(self, data: C) -> M:
         """
         Create new record
@@ -47,15 +132,27 @@ class CRUDService(BaseSessionService, Generic[M, C, U]):
 
         :return: created model
         """
-        log.debug(f"Creating {self.DB_MODEL.__name__} with data: {data}")
-        return await self._repo.create(self.DB_MODEL(**data.model_dump()))
+        log.debug("Creating %s with data: %s", self.DB_MODEL.__name__, data)
+        await self._wait_for_history()
 
-    async def _update(self, _id: int, data: U) -> M:
+        record = await self._repo.create(self.DB_MODEL(**await self._get_model_data(data)))
+        self._bump_generation()
+
+        # FIXME: mypy doesn't understand that model has id
+        self._record_history(HistoryAction.CREATE, record.id, None, self._snapshot(record))  # type: ignore
+        return record
+
+    async def _update(self, _id: int, data: U, version: int | None = None) -> M:
         """
         Update existing record
 
+        If the model is versioned (``version_id_col``), the flush is a conditional
+        ``UPDATE ... WHERE id = ? AND version = ?``, so a concurrent write fails
+        with PreconditionFailedError instead of being silently overwritten.
+
         :param _id: record id
         :param data: pydantic model
+        :param version: expected record version (e.g. from If-Match header), None to skip the check
 
         :return: updated model
         """
@@ -64,19 +161,40 @@ class CRUDService(BaseSessionService, Generic[M, C, U]):
         if not record:
             self._raise_not_found(_id)
 
-        for field, value in data.model_dump().items():
+        if version is not None and getattr(record, "version", None) != version:
+            self._raise_precondition_failed(_id)
+
+        await self._wait_for_history()
+        before = self._snapshot(record)
+
+        for field, value in (await self._get_model_data(data)).items():
             setattr(record, field, value)
 
-        log.debug(f"Updating {self.DB_MODEL.__name__} with data: {data}")
+        self._touch_on_relationship_change(record)
+
+        log.debug("Updating %s with data: %s", self.DB_MODEL.__name__, data)
+
+        try:
+            record = await self._repo.update(record)
 
-        # FIXME: mypy doesn't understand that result is not None
-        return await self._repo.update(record)  # type: ignore
+        except StaleDataError:
+            self._raise_precondition_failed(_id)
 
-    async def _delete(self, _id: int) -> bool:
+        self._bump_generation()
+        self._record_history(HistoryAction.UPDATE, _id, before, self._snapshot(record))
+
+        return record
+
+    async def _delete(self, _id: int, version: int | None = None) -> bool:
         """
         Delete existing record
 
+        The delete is flushed right away: for a versioned model it's a conditional
+        ``DELETE ... WHERE id = ? AND version = ?``, so a concurrent write fails
+        with PreconditionFailedError before the response is built.
+
         :param _id: record id
+        :param version: expected record version (e.g. from If-Match header), None to skip the check
 
         :return: bool
         """
@@ -85,20 +203,34 @@ class CRUDService(BaseSessionService, Generic[M, C, U]):
         if not record:
             self._raise_not_found(_id)
 
+        if version is not None and getattr(record, "version", None) != version:
+            self._raise_precondition_failed(_id)
+
+        await self._wait_for_history()
+        before = self._snapshot(record)
+
         try:
-            # FIXME: mypy doesn't understand
-            await self._repo.delete(record)  # type: ignore
+            await self._repo.delete(record)
+
+        except StaleDataError:
+            self._raise_precondition_failed(_id)
 
         except IntegrityError as e:
-            log.error(f"Failed to delete {self.DB_MODEL.__name__} with id={_id} due to IntegrityError - {e}")
+            log.error("Failed to delete %s with id=%s due to IntegrityError - %s", self.DB_MODEL.__name__, _id, e)
+            # NOTE: the failed flush leaves the transaction unusable, nothing of it can be committed
+            await self._repo.rollback()
             return False
 
         except Exception as e:
-            log.error(f"Failed to delete {self.DB_MODEL.__name__} with id={_id} due to unknown Exception - {e}")
+            log.error("Failed to delete %s with id=%s due to unknown Exception - %s", self.DB_MODEL.__name__, _id, e)
+            await self._repo.rollback()
             return False
 
         else:
-            log.debug(f"Deleted {self.DB_MODEL.__name__} with id={_id}")
+            log.debug("Deleted %s with id=%s", self.DB_MODEL.__name__, _id)
+
+        self._bump_generation()
+        self._record_history(HistoryAction.DELETE, _id, before, None)
 
         return True
 
@@ -115,8 +247,7 @@ class CRUDService(BaseSessionService, Generic[M, C, U]):
         if res is None:
             self._raise_not_found(_id)
 
-        # FIXME: mypy doesn't understand that res is not None
-        return res  # type: ignore
+        return res
 
     async def create(self, data: C) -> M:
         """
@@ -143,12 +274,13 @@ class CRUDService(BaseSessionService, Generic[M, C, U]):
         """
         return await self._create(data)
 
-    async def update(self, _id: int, data: U) -> M:
+    async def update(self, _id: int, data: U, version: int | None = None) -> M:
         """
         Update existing record
 
         :param _id: record id
         :param data: pydantic model
+        :param version: expected record version, None to skip the check
 
         :return: updated model
 
@@ -162,19 +294,20 @@ class CRUDService(BaseSessionService, Generic[M, C, U]):
 
                 DB_MODEL = MyAwesomeModel
 
-                async def update(self, _id: int, data: MyAwesomeUpdate) -> MyAwesomeModel:
+                async def update(self, _id: int, data: MyAwesomeUpdate, version: int | None = None) -> MyAwesomeModel:
                     # do something before update
-                    result = await super().update(_id, data)
+                    result = await super().update(_id, data, version)
                     # do something after update
                     return result
         """
-        return await self._update(_id, data)
+        return await self._update(_id, data, version)
 
-    async def delete(self, _id: int) -> bool:
+    async def delete(self, _id: int, version: int | None = None) -> bool:
         """
         Delete existing record
 
         :param _id: record id
+        :param version: expected record version, None to skip the check
 
         :return: bool
 
@@ -188,13 +321,13 @@ class CRUDService(BaseSessionService, Generic[M, C, U]):
 
                 DB_MODEL = MyAwesomeModel
 
-                async def delete(self, _id: int) -> bool:
+                async def delete(self, _id: int, version: int | None = None) -> bool:
                     # do something before delete
-                    result = await super().delete(_id)
+                    result = await super().delete(_id, version)
                     # do something after delete
                     return result
         """
-        return await self._delete(_id)
+        return await self._delete(_id, version)
 
     async def get_by_id(self, task_id: int) -> M:
         """Get record by id"""
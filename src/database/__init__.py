@@ -1,5 +1,8 @@
-from .models import TodoTask
+from .models import IdempotencyKey, Tag, TaskHistory, TodoTask
 
 __all__ = [
+    "IdempotencyKey",
+    "Tag",
+    "TaskHistory",
     "TodoTask",
 ]
@@ -1,9 +1,75 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
+import asyncio
+import logging
 
-from src.core.config import PostgresEngineType, get_postgres_uri
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from src.core.config import PostgresEngineType, config, get_pool_limits, get_postgres_uri
+
+from .models import TodoTask
+from .stats import statement_cache_stats
+
+log = logging.getLogger(__name__)
 
 postgres_uri = get_postgres_uri(PostgresEngineType.asyncpg)
 
-engine = create_async_engine(postgres_uri, pool_pre_ping=True)
-SessionMaker = sessionmaker(engine, autoflush=False, class_=AsyncSession, expire_on_commit=False)
+# NOTE: the engine is bound in the app lifespan (see main.py), not at import time
+SessionMaker = async_sessionmaker(autoflush=False, expire_on_commit=False)
+
+
+def create_engine() -> AsyncEngine:
+    """Create the application engine, pool is sized per worker process"""
+    pool_size, max_overflow = get_pool_limits()
+
+    engine = create_async_engine(
+        postgres_uri,
+        pool_pre_ping=True,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=config.DB_POOL_TIMEOUT,
+        query_cache_size=config.DB_QUERY_CACHE_SIZE,
+        connect_args={
+            # NOTE: SQLAlchemy asyncpg adapter cache of prepared statements
+            "prepared_statement_cache_size": config.DB_PREPARED_STATEMENT_CACHE_SIZE,
+            # NOTE: asyncpg own statement cache
+            "statement_cache_size": config.DB_ASYNCPG_STATEMENT_CACHE_SIZE,
+            # NOTE: default statement timeout is a connection setting, so transactions don't pay a round trip for it
+            "server_settings": {"statement_timeout": str(config.DB_STATEMENT_TIMEOUT)},
+        },
+    )
+    statement_cache_stats.track(engine)
+
+    return engine
+
+
+async def _warm_up_connection(engine: AsyncEngine) -> None:
+    # NOTE: imported here, repositories and services depend on this package
+    from src.core.repo import Repository
+    from src.enums import TodoStatus
+    from src.services import TodoTasksService
+
+    async with engine.connect() as connection, AsyncSession(bind=connection) as session:
+        # NOTE: the same service calls the endpoints make (owner-scoped get, lists and quota count),
+        # so compiled cache, prepared statements and asyncpg type introspection (todostatus enum)
+        # are hot before the first request; the empty owner has no tasks
+        service = TodoTasksService(session, owner_id="")
+
+        await session.get(TodoTask, 0)
+        await service.get_all()
+        await service.get_all(status=TodoStatus.PENDING)
+        await service.get_all(tags=[""])
+        await Repository(TodoTask, session, {"owner_id": ""}).count()
+
+
+async def warm_up_engine(engine: AsyncEngine, connections: int) -> None:
+    """
+    Pre-open pool connections and warm the hot statements on each of them
+
+    :param engine: engine to warm up
+    :param connections: number of connections to open, capped by the pool size
+    """
+    connections = min(connections, get_pool_limits()[0])
+
+    # NOTE: connections are held concurrently, so the pool has to open a new one for each
+    await asyncio.gather(*(_warm_up_connection(engine) for _ in range(connections)))
+
+    log.info("Warmed up %s database connections", connections)
@@ -1,29 +1,33 @@
 from datetime import datetime
 
-from sqlalchemy import BigInteger, DateTime, Enum, Text
+from sqlalchemy import JSON, BigInteger, Column, DateTime, Enum, ForeignKey, Index, Integer, Table, Text, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.dialects.sqlite import INTEGER
 from sqlalchemy.ext.asyncio import AsyncAttrs
 from sqlalchemy.orm import (
     DeclarativeBase,
     Mapped,
     mapped_column,
+    relationship,
 )
 from sqlalchemy.sql import func
 
-from src.enums import TodoStatus
+from src.enums import HistoryAction, TodoStatus
+
+# NOTE: SQLite doesn't love BigIntegers as primary keys with autoincrement
+ID_TYPE = BigInteger().with_variant(
+    INTEGER(),
+    "sqlite",
+    "aiosqlite",
+    "sqlite+aiosqlite",
+)
 
 
 class BaseModel(AsyncAttrs, DeclarativeBase):
     """Base Model with id field"""
 
-    # NOTE: SQLite doesn't love BigIntegers as primary keys with autoincrement
     id: Mapped[int] = mapped_column(
-        BigInteger().with_variant(
-            INTEGER(),
-            "sqlite",
-            "aiosqlite",
-            "sqlite+aiosqlite",
-        ),
+        ID_TYPE,
         primary_key=True,
         autoincrement=True,
     )
@@ -43,6 +47,24 @@ class CreateUpdateMixin:
     )
 
 
+task_tags = Table(
+    "task_tags",
+    BaseModel.metadata,
+    Column("task_id", ID_TYPE, ForeignKey("todo_tasks.id", ondelete="CASCADE"), primary_key=True),
+    Column("tag_id", ID_TYPE, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True),
+    # NOTE: primary key covers task -> tags lookups, this one covers filtering tasks by tag
+    Index("ix_task_tags_tag_id_task_id", "tag_id", "task_id"),
+)
+
+
+class Tag(BaseModel):
+    """Model for task tags"""
+
+    __tablename__ = "tags"
+
+    name: Mapped[str] = mapped_column(Text, unique=True, comment="Tag name")
+
+
 class TodoTask(CreateUpdateMixin, BaseModel):
     """Model for todo tasks"""
 
@@ -51,9 +73,77 @@ class TodoTask(CreateUpdateMixin, BaseModel):
     title: Mapped[str] = mapped_column(Text, comment="Title of the task")
     description: Mapped[str] = mapped_column(Text, comment="Description of the task")
 
+    owner_id: Mapped[str] = mapped_column(Text, comment="Owner (caller identity) of the task")
+
+    # NOTE: adjacency list, subtrees are fetched with a recursive CTE (see TodoTasksService.get_tree);
+    # no ON DELETE CASCADE - subtasks are never removed behind the service's back (see TodoTasksService.delete)
+    parent_id: Mapped[int | None] = mapped_column(
+        ID_TYPE,
+        ForeignKey("todo_tasks.id"),
+        index=True,
+        nullable=True,
+        comment="Parent task id",
+    )
+
     status: Mapped[TodoStatus] = mapped_column(
         Enum(TodoStatus),
         default=TodoStatus.PENDING,
         server_default=TodoStatus.PENDING,
         comment="Status of the task",
     )
+
+    # NOTE: optimistic locking - every UPDATE is emitted as `WHERE id = ? AND version = ?`
+    version: Mapped[int] = mapped_column(
+        Integer,
+        default=1,
+        server_default="1",
+        comment="Row version for optimistic concurrency control",
+    )
+
+    # NOTE: tags of all loaded tasks are fetched with one extra SELECT ... IN query (no N+1)
+    tags: Mapped[list[Tag]] = relationship(secondary=task_tags, lazy="selectin", order_by=Tag.name)
+
+    __mapper_args__ = {
+        "version_id_col": version,
+    }
+
+    # NOTE: owner lists are range scans in list order: (owner_id, created_at, id) for all tasks,
+    # (owner_id, status, created_at, id) for one status; the owner prefix serves per-owner counts (index-only)
+    __table_args__ = (
+        Index("ix_todo_tasks_owner_id_created_at_id", "owner_id", "created_at", "id"),
+        Index("ix_todo_tasks_owner_id_status_created_at_id", "owner_id", "status", "created_at", "id"),
+    )
+
+
+class TaskHistory(BaseModel):
+    """Audit history of task changes, written in batches by src.core.audit.AuditWriter"""
+
+    __tablename__ = "task_history"
+
+    owner_id: Mapped[str] = mapped_column(Text, comment="Owner of the task")
+    # NOTE: no foreign key - history outlives deleted tasks
+    record_id: Mapped[int] = mapped_column(ID_TYPE, comment="Task id")
+    action: Mapped[HistoryAction] = mapped_column(Enum(HistoryAction), comment="Change type")
+    before: Mapped[dict | None] = mapped_column(JSON().with_variant(JSONB(), "postgresql"), comment="Values before the change")
+    after: Mapped[dict | None] = mapped_column(JSON().with_variant(JSONB(), "postgresql"), comment="Values after the change")
+    request_id: Mapped[str | None] = mapped_column(Text, comment="Request id of the change")
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), comment="Time of the change")
+
+    # NOTE: history of a task, newest first (keyset pagination by id)
+    __table_args__ = (Index("ix_task_history_owner_id_record_id_id", "owner_id", "record_id", "id"),)
+
+
+class IdempotencyKey(BaseModel):
+    """Stored response of a request made with Idempotency-Key, replayed to retries until it expires"""
+
+    __tablename__ = "idempotency_keys"
+
+    owner_id: Mapped[str] = mapped_column(Text, comment="Owner (caller identity) of the key")
+    key: Mapped[str] = mapped_column(Text, comment="Idempotency-Key header value")
+    request_hash: Mapped[str] = mapped_column(Text, comment="Hash of the request body, a key can't be reused for another body")
+    status_code: Mapped[int | None] = mapped_column(Integer, comment="Status code of the stored response")
+    response: Mapped[str | None] = mapped_column(Text, comment="Stored response body")
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), comment="Time of the first request")
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True, comment="Key is purged after this time")
+
+    __table_args__ = (UniqueConstraint("owner_id", "key"),)
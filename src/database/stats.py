@@ -0,0 +1,50 @@
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine.default import CACHE_HIT, CACHE_MISS
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+class StatementCacheStats:
+    def __init__(self) -> None:
+        """
+        SQLAlchemy compiled cache counters, collected from every executed statement
+        """
+        self.hits = 0
+        self.misses = 0
+        self.uncached = 0
+
+    def track(self, engine: AsyncEngine) -> None:
+        """Start collecting stats for the engine"""
+        event.listen(engine.sync_engine, "before_cursor_execute", self._record)
+
+    def untrack(self, engine: AsyncEngine) -> None:
+        """Stop collecting stats for the engine"""
+        if event.contains(engine.sync_engine, "before_cursor_execute", self._record):
+            event.remove(engine.sync_engine, "before_cursor_execute", self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        cache_hit = getattr(context, "cache_hit", None)
+
+        if cache_hit is CACHE_HIT:
+            self.hits += 1
+        elif cache_hit is CACHE_MISS:
+            self.misses += 1
+        else:
+            self.uncached += 1
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "uncached": self.uncached,
+            "hit_ratio": self.hit_ratio,
+        }
+
+
+statement_cache_stats = StatementCacheStats()
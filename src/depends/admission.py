@@ -0,0 +1,25 @@
+from typing import AsyncGenerator
+
+from fastapi import Request
+
+from src.core.admission import admission
+from src.core.exceptions import ServiceOverloadedError
+from src.core.routing import get_route_key
+
+
+async def admit(request: Request) -> AsyncGenerator[None, None]:
+    """
+    Admission control: hold a per-route slot for the whole request or shed it with ServiceOverloadedError
+
+    Must run before any dependency that acquires a pool connection.
+    """
+    route_key = get_route_key(request)
+    limiter = admission.get_limiter(route_key)
+
+    if not await limiter.acquire():
+        raise ServiceOverloadedError(f"Route {route_key} is overloaded, retry later")
+
+    try:
+        yield
+    finally:
+        limiter.release()
@@ -0,0 +1,25 @@
+from typing import Annotated
+
+from fastapi import Header, HTTPException, status
+
+
+async def get_if_match_version(if_match: Annotated[str | None, Header()] = None) -> int | None:
+    """
+    Parse the If-Match header into an expected record version
+
+    Accepts strong and weak ETags (``"3"``, ``W/"3"``). Missing header or ``*`` means no version check.
+    """
+    if if_match is None or if_match.strip() == "*":
+        return None
+
+    etag = if_match.strip().removeprefix("W/").strip('"')
+
+    try:
+        return int(etag)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid If-Match header: {if_match}") from None
+
+
+def make_etag(version: int) -> str:
+    """Build ETag header value from record version"""
+    return f'"{version}"'
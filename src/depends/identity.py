@@ -0,0 +1,15 @@
+from fastapi import HTTPException, Request, status
+
+from src.core.config import config
+
+
+async def get_owner_id(request: Request) -> str:
+    """
+    Get caller identity from the OWNER_HEADER header (set by the auth proxy in front of the API)
+    """
+    owner_id = request.headers.get(config.OWNER_HEADER, "").strip()
+
+    if not owner_id or len(owner_id) > 64:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=f"Missing or invalid {config.OWNER_HEADER} header")
+
+    return owner_id
@@ -1,13 +1,37 @@
 from typing import AsyncGenerator
 
+from fastapi import Request
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.core.config import config
+from src.core.routing import get_route_key
 from src.database.connection import SessionMaker
 
 
-async def get_session() -> AsyncGenerator[AsyncSession, None]:
+def get_statement_timeout(request: Request) -> int:
+    """Get statement timeout (ms) for the matched route"""
+    return config.DB_ROUTE_STATEMENT_TIMEOUTS.get(get_route_key(request), config.DB_STATEMENT_TIMEOUT)
+
+
+async def get_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
     """
     Get an async session
+
+    On Postgres the default ``statement_timeout`` is set on connect (see create_engine);
+    routes with their own timeout override it for the transaction (``SET LOCAL`` semantics),
+    so a slow query can't hold a pool connection longer than the route allows.
+
+    The transaction is committed when the dependency exits: after the response is sent
+    by default, before it with ``Depends(get_session, scope="function")`` (write routes).
     """
     async with SessionMaker() as session, session.begin():
+        timeout = get_statement_timeout(request)
+
+        if timeout != config.DB_STATEMENT_TIMEOUT and session.get_bind().dialect.name == "postgresql":
+            await session.execute(
+                text("SELECT set_config('statement_timeout', :timeout, true)"),
+                {"timeout": f"{timeout}ms"},
+            )
+
         yield session
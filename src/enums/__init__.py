@@ -1,5 +1,7 @@
+from .history_action import HistoryAction
 from .todo_status import TodoStatus
 
 __all__ = [
+    "HistoryAction",
     "TodoStatus",
 ]
@@ -0,0 +1,7 @@
+from enum import StrEnum
+
+
+class HistoryAction(StrEnum):
+    CREATE = "create"
+    UPDATE = "update"
+    DELETE = "delete"
@@ -0,0 +1,11 @@
+from .disconnect import CancelOnDisconnectMiddleware
+from .profiling import ProfilingMiddleware
+from .request_id import RequestIdMiddleware
+from .tracking import RequestTrackingMiddleware
+
+__all__ = [
+    "CancelOnDisconnectMiddleware",
+    "ProfilingMiddleware",
+    "RequestIdMiddleware",
+    "RequestTrackingMiddleware",
+]
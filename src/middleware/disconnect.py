@@ -0,0 +1,81 @@
+import asyncio
+import logging
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+log = logging.getLogger(__name__)
+
+
+class CancelOnDisconnectMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        """
+        Cancel request handling as soon as the client disconnects
+
+        The request runs in its own task while a watcher listens for ``http.disconnect``.
+        Cancelling the task cancels the in-flight asyncpg query (asyncpg sends a cancel
+        request to the server) and the session context rolls the transaction back,
+        so the pool connection is released right away.
+
+        :param app: ASGI app
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # NOTE: maxsize=1 - the watcher doesn't read the request body ahead of the app
+        messages: asyncio.Queue[Message] = asyncio.Queue(maxsize=1)
+        disconnected = asyncio.Event()
+        response_complete = False
+
+        async def receive_wrapper() -> Message:
+            if disconnected.is_set() and messages.empty():
+                return {"type": "http.disconnect"}
+            return await messages.get()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_complete
+
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                response_complete = True
+
+            await send(message)
+
+        async def run_app() -> None:
+            await self.app(scope, receive_wrapper, send_wrapper)
+
+        app_task: asyncio.Task[None] = asyncio.create_task(run_app())
+
+        async def watch_disconnect() -> None:
+            while True:
+                message = await receive()
+
+                if message["type"] == "http.disconnect":
+                    disconnected.set()
+
+                    # NOTE: after the response is sent only background tasks are left, let them finish
+                    if not response_complete:
+                        log.info("Client disconnected, cancelling %s %s", scope["method"], scope["path"])
+                        app_task.cancel()
+
+                    return
+
+                await messages.put(message)
+
+        watcher = asyncio.create_task(watch_disconnect())
+
+        try:
+            await app_task
+
+        except asyncio.CancelledError:
+            current_task = asyncio.current_task()
+
+            # NOTE: re-raise if the middleware itself is being cancelled (e.g. server shutdown)
+            if not disconnected.is_set() or (current_task is not None and current_task.cancelling()):
+                app_task.cancel()
+                raise
+
+        finally:
+            watcher.cancel()
@@ -0,0 +1,107 @@
+import asyncio
+import logging
+import random
+import re
+import time
+from pathlib import Path
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.profiling import create_profiler
+
+log = logging.getLogger(__name__)
+
+INLINE = "inline"
+FILE = "file"
+
+# NOTE: any other header value is ignored, a client can't make the server write files at will
+MODES = frozenset({INLINE, FILE})
+
+
+class ProfilingMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        header: str,
+        sample_rate: float,
+        output_dir: str,
+        profile_format: str,
+        interval: float,
+    ) -> None:
+        """
+        Profile requests on demand
+
+        A request is profiled if it has the profiling header or is picked by ``sample_rate``.
+        With header value ``inline`` the profile replaces the response body, with ``file``
+        (and for sampled requests) it is written to ``output_dir``, other values are ignored.
+        Only added to the app when PROFILING_ENABLED is set, so it costs nothing when disabled.
+
+        :param app: ASGI app
+        :param header: request header that triggers profiling
+        :param sample_rate: share of requests profiled without the header (0..1)
+        :param output_dir: directory for profile files
+        :param profile_format: "collapsed" or "html"
+        :param interval: sampling interval in seconds
+        """
+        self.app = app
+        self.header = header.lower().encode()
+        self.sample_rate = sample_rate
+        self.output_dir = Path(output_dir)
+        self.profile_format = profile_format
+        self.interval = interval
+
+    def _get_mode(self, scope: Scope) -> str | None:
+        for name, value in scope["headers"]:
+            if name == self.header:
+                mode = value.decode("latin-1").strip().lower()
+                return mode if mode in MODES else None
+
+        if self.sample_rate and random.random() < self.sample_rate:
+            return FILE
+
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        mode = self._get_mode(scope) if scope["type"] == "http" else None
+
+        if mode is None:
+            await self.app(scope, receive, send)
+            return
+
+        profiler = create_profiler(self.profile_format, self.interval)
+        send_to = self._discard if mode == INLINE else send
+
+        profiler.start()
+
+        try:
+            await self.app(scope, receive, send_to)
+        finally:
+            profiler.stop()
+
+        content = profiler.render()
+
+        if mode == INLINE:
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 200,
+                    "headers": [(b"content-type", profiler.content_type.encode())],
+                }
+            )
+            await send({"type": "http.response.body", "body": content.encode()})
+            return
+
+        name = re.sub(r"[^A-Za-z0-9]+", "_", f"{scope['method']}{scope['path']}").strip("_")
+        path = self.output_dir / f"{time.strftime('%Y%m%d-%H%M%S')}-{time.monotonic_ns()}-{name}.{profiler.extension}"
+
+        await asyncio.to_thread(self._write, path, content)
+        log.info("Profile of %s %s written to %s", scope["method"], scope["path"], path)
+
+    @staticmethod
+    async def _discard(_: Message) -> None:
+        pass
+
+    @staticmethod
+    def _write(path: Path, content: str) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
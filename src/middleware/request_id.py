@@ -0,0 +1,45 @@
+import re
+from uuid import uuid4
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.log import request_id_var
+
+REQUEST_ID_HEADER = "x-request-id"
+
+# NOTE: the id is echoed back and written to every log record, anything else is replaced by a new one
+REQUEST_ID_PATTERN = re.compile(r"[A-Za-z0-9._-]{1,128}")
+
+
+class RequestIdMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        """
+        Bind request id (valid X-Request-ID header or a new one) to log records and the response
+
+        :param app: ASGI app
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = next((value.decode("latin-1") for name, value in scope["headers"] if name == REQUEST_ID_HEADER.encode()), "")
+
+        if not REQUEST_ID_PATTERN.fullmatch(request_id):
+            request_id = uuid4().hex
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)[REQUEST_ID_HEADER] = request_id
+
+            await send(message)
+
+        token = request_id_var.set(request_id)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_id_var.reset(token)
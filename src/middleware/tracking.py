@@ -0,0 +1,27 @@
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.core.lifecycle import Lifecycle
+
+
+class RequestTrackingMiddleware:
+    def __init__(self, app: ASGIApp, lifecycle: Lifecycle) -> None:
+        """
+        Count in-flight HTTP requests so shutdown can drain them before disposing the engine
+
+        :param app: ASGI app
+        :param lifecycle: application lifecycle state
+        """
+        self.app = app
+        self.lifecycle = lifecycle
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        self.lifecycle.request_started()
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.lifecycle.request_finished()
@@ -1,5 +1,10 @@
+from .idempotency import IdempotencyService, idempotency_purger
+from .task_history import TaskHistoryService
 from .todo_tasks import TodoTasksService
 
 __all__ = [
+    "IdempotencyService",
+    "TaskHistoryService",
     "TodoTasksService",
+    "idempotency_purger",
 ]
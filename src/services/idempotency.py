@@ -0,0 +1,188 @@
+import asyncio
+import hashlib
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.core.config import config
+from src.core.exceptions import IdempotencyKeyInProgressError, IdempotencyKeyReusedError
+from src.core.repo.dialect import get_insert
+from src.core.service import BaseSessionService
+from src.database import IdempotencyKey
+
+log = logging.getLogger(__name__)
+
+
+class IdempotencyService(BaseSessionService):
+    def __init__(self, session: AsyncSession, owner_id: str) -> None:
+        """
+        Idempotency keys of the owner
+
+        A key is claimed in the request transaction and the response is stored in the same transaction,
+        so the stored response exists if and only if the request's writes were committed.
+
+        :param session: SQLAlchemy session
+        :param owner_id: owner of the keys
+        """
+        super().__init__(session)
+
+        self.owner_id = owner_id
+
+    @staticmethod
+    def get_request_hash(body: str | bytes) -> str:
+        """Hash of the normalized request body"""
+        return hashlib.sha256(body.encode() if isinstance(body, str) else body).hexdigest()
+
+    async def claim(self, key: str, request_hash: str) -> IdempotencyKey | None:
+        """
+        Claim the key for this request or get the stored response of the first one
+
+        A duplicate of an in-flight request waits on the unique index until the first
+        transaction ends (Postgres row lock): on commit it gets the stored response,
+        on rollback it claims the key itself. Expired keys are claimed again.
+
+        :param key: Idempotency-Key header value
+        :param request_hash: hash of the request body
+
+        :return: None if claimed (the request has to be processed), otherwise the stored key
+        """
+        now = datetime.now(timezone.utc)
+
+        insert = get_insert(self._session)
+        stmt = insert(IdempotencyKey).values(
+            owner_id=self.owner_id,
+            key=key,
+            request_hash=request_hash,
+            created_at=now,
+            expires_at=now + timedelta(seconds=config.IDEMPOTENCY_KEY_TTL),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[IdempotencyKey.owner_id, IdempotencyKey.key],
+            set_={
+                "request_hash": stmt.excluded.request_hash,
+                "status_code": None,
+                "response": None,
+                "created_at": stmt.excluded.created_at,
+                "expires_at": stmt.excluded.expires_at,
+            },
+            where=IdempotencyKey.expires_at <= now,
+        ).returning(IdempotencyKey.id)
+
+        if (await self._session.execute(stmt)).scalar_one_or_none() is not None:
+            return None
+
+        result = await self._session.execute(
+            select(IdempotencyKey).where(IdempotencyKey.owner_id == self.owner_id, IdempotencyKey.key == key)
+        )
+        record = result.scalar_one()
+
+        if record.request_hash != request_hash:
+            raise IdempotencyKeyReusedError(f"Idempotency-Key {key} was already used for another request")
+
+        if record.response is None:
+            raise IdempotencyKeyInProgressError(f"Request with Idempotency-Key {key} is still in progress")
+
+        return record
+
+    async def save(self, key: str, status_code: int, response: str | bytes) -> None:
+        """
+        Store the response of the claimed key (committed together with the request)
+
+        :param key: Idempotency-Key header value
+        :param status_code: response status code
+        :param response: response body
+        """
+        await self._session.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.owner_id == self.owner_id, IdempotencyKey.key == key)
+            .values(status_code=status_code, response=response.decode() if isinstance(response, bytes) else response)
+        )
+
+
+class IdempotencyPurger:
+    def __init__(self, interval: float, batch_size: int) -> None:
+        """
+        Background deletion of expired idempotency keys
+
+        Deletes in batches of ``batch_size`` rows, one short transaction per batch,
+        so purging never holds long locks or a big transaction.
+
+        :param interval: time in seconds between purges
+        :param batch_size: max number of rows deleted per transaction
+        """
+        self.interval = interval
+        self.batch_size = batch_size
+
+        self.purged = 0
+
+        self._session_maker: async_sessionmaker | None = None
+        self._task: asyncio.Task | None = None
+
+    def start(self, session_maker: async_sessionmaker) -> None:
+        """
+        Start the background purge
+
+        :param session_maker: session maker bound to the engine
+        """
+        self._session_maker = session_maker
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background purge"""
+        if self._task is not None:
+            self._task.cancel()
+
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+
+            try:
+                await self.purge()
+            except Exception:
+                log.exception("Failed to purge expired idempotency keys")
+
+    async def purge(self, session_maker: async_sessionmaker | None = None) -> int:
+        """
+        Delete expired keys
+
+        :param session_maker: session maker, defaults to the one passed to start
+
+        :return: number of deleted keys
+        """
+        # FIXME: mypy doesn't understand that one of session makers is set
+        session_maker = session_maker or self._session_maker  # type: ignore
+        purged = 0
+
+        while True:
+            now = datetime.now(timezone.utc)
+            expired = select(IdempotencyKey.id).where(IdempotencyKey.expires_at <= now).limit(self.batch_size)
+
+            async with session_maker() as session, session.begin():  # type: ignore
+                result: Any = await session.execute(delete(IdempotencyKey).where(IdempotencyKey.id.in_(expired.scalar_subquery())))
+
+            purged += result.rowcount
+
+            if result.rowcount < self.batch_size:
+                break
+
+        if purged:
+            log.info("Purged %s expired idempotency keys", purged)
+
+        self.purged += purged
+        return purged
+
+
+idempotency_purger = IdempotencyPurger(
+    interval=config.IDEMPOTENCY_PURGE_INTERVAL,
+    batch_size=config.IDEMPOTENCY_PURGE_BATCH_SIZE,
+)
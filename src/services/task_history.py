@@ -0,0 +1,39 @@
+from typing import Sequence
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.service import BaseSessionService
+from src.database import TaskHistory
+
+
+class TaskHistoryService(BaseSessionService):
+    def __init__(self, session: AsyncSession, owner_id: str) -> None:
+        """
+        Read access to task history of the owner
+
+        :param session: SQLAlchemy session
+        :param owner_id: owner of the tasks
+        """
+        super().__init__(session)
+
+        self.owner_id = owner_id
+
+    async def get_page(self, task_id: int, limit: int, before: int | None = None) -> Sequence[TaskHistory]:
+        """
+        Get task history, newest first
+
+        Keyset pagination over ``(owner_id, record_id, id)`` index: pass id of the last row of a page
+        as ``before`` to get the next one. Changes show up after the audit writer flushes them.
+
+        :param task_id: task id
+        :param limit: max number of rows
+        :param before: return rows older than this history id
+        """
+        stmt = select(TaskHistory).where(TaskHistory.owner_id == self.owner_id, TaskHistory.record_id == task_id)
+
+        if before is not None:
+            stmt = stmt.where(TaskHistory.id < before)
+
+        result = await self._session.execute(stmt.order_by(TaskHistory.id.desc()).limit(limit))
+        return result.scalars().all()
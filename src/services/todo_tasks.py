@@ -1,6 +1,18 @@
+from typing import Any, AsyncIterator, Sequence
+
+from sqlalchemy import Row, bindparam, case, exists, func, literal, select
+
 from src.api.v1.schamas import TodoTaskCreate, TodoTaskUpdate
+from src.core.config import config
+from src.core.exceptions import QuotaExceededError, TaskHasSubtasksError
+from src.core.repo.dialect import get_insert
 from src.core.service import CRUDService
-from src.database import TodoTask
+from src.database import Tag, TaskHistory, TodoTask
+from src.enums import TodoStatus
+
+# NOTE: list filters with bindparams, statements of each filter combination are built once (see get_all)
+STATUS_CLAUSE = TodoTask.status == bindparam("status")
+TAGS_CLAUSE = TodoTask.tags.any(Tag.name.in_(bindparam("tags", expanding=True)))
 
 
 class TodoTasksService(CRUDService[TodoTask, TodoTaskCreate, TodoTaskUpdate]):
@@ -8,3 +20,194 @@ class TodoTasksService(CRUDService[TodoTask, TodoTaskCreate, TodoTaskUpdate]):
     UPDATE_MODEL = TodoTaskUpdate
 
     DB_MODEL = TodoTask
+    TRACK_GENERATION = True
+    HISTORY_MODEL = TaskHistory
+
+    OWNER_FIELD = "owner_id"
+
+    async def _get_tags(self, names: Sequence[str]) -> list[Tag]:
+        """
+        Get tags by names, creating missing ones
+
+        :param names: tag names
+
+        :return: tags
+        """
+        names = sorted(set(names))
+
+        if not names:
+            return []
+
+        # NOTE: ON CONFLICT DO NOTHING - concurrent requests may create the same tag
+        insert = get_insert(self._session)
+        await self._session.execute(
+            insert(Tag).values([{"name": name} for name in names]).on_conflict_do_nothing(index_elements=[Tag.name])
+        )
+
+        result = await self._session.execute(select(Tag).where(Tag.name.in_(names)))
+        return list(result.scalars().all())
+
+    def _snapshot(self, record: TodoTask) -> dict[str, Any]:
+        return {**super()._snapshot(record), "tags": [tag.name for tag in record.tags]}
+
+    async def _get_model_data(self, data: TodoTaskCreate | TodoTaskUpdate) -> dict[str, Any]:
+        values = data.model_dump(exclude={"tags"})
+
+        parent_id = values.get("parent_id")
+
+        if parent_id is not None and await self._repo.get_by_pk(parent_id) is None:
+            self._raise_not_found(parent_id)
+
+        if data.tags is not None:
+            values["tags"] = await self._get_tags(data.tags)
+
+        return values
+
+    async def create(self, data: TodoTaskCreate) -> TodoTask:
+        """
+        Create new task, up to TASKS_PER_OWNER_LIMIT tasks per owner
+
+        :param data: task data
+        """
+        # NOTE: soft limit - concurrent creates of one owner may overshoot it by their number
+        if config.TASKS_PER_OWNER_LIMIT and await self._repo.count() >= config.TASKS_PER_OWNER_LIMIT:
+            raise QuotaExceededError(f"Owner {self.owner_id} has reached the limit of {config.TASKS_PER_OWNER_LIMIT} tasks")
+
+        return await super().create(data)
+
+    async def delete(self, _id: int, version: int | None = None) -> bool:
+        """
+        Delete the task, a task with subtasks can't be deleted
+
+        :param _id: task id
+        :param version: expected task version, None to skip the check
+        """
+        # NOTE: the owner check comes first, super().delete gets the same instance from the identity map
+        record = await self._repo.get_by_pk(_id)
+
+        if record is not None and await self._session.scalar(select(exists().where(TodoTask.parent_id == _id))):
+            raise TaskHasSubtasksError(f"Record {self.DB_MODEL.__name__} with id={_id} has subtasks, delete them first")
+
+        return await super().delete(_id, version)
+
+    async def get_all(self, tags: Sequence[str] | None = None, status: TodoStatus | None = None) -> Sequence[TodoTask]:
+        """
+        Get all tasks of the owner in creation order
+
+        :param tags: only tasks having any of the tags
+        :param status: only tasks with the status
+        """
+        clauses = []
+        params: dict[str, Any] = {}
+
+        if status is not None:
+            clauses.append(STATUS_CLAUSE)
+            params["status"] = status
+
+        if tags:
+            clauses.append(TAGS_CLAUSE)
+            params["tags"] = list(tags)
+
+        return await self._repo.where(
+            *clauses,
+            order_by=(TodoTask.created_at, TodoTask.id),
+            key=("list", status is not None, bool(tags)),
+            params=params,
+        )
+
+    async def _stream_tree(self, task_id: int, max_depth: int, batch_size: int) -> AsyncIterator[Row[Any]]:
+        """
+        Stream the subtree of the task with one recursive CTE query, nothing if the task doesn't exist
+
+        :param task_id: root task id
+        :param max_depth: max depth of returned descendants (0 - the task only)
+        :param batch_size: rows fetched from the database cursor at once
+        """
+        # NOTE: subtree(id, parent_id, depth) - the depth check also stops the recursion on cyclic data
+        subtree = (
+            select(TodoTask.id, TodoTask.parent_id, literal(0).label("depth"))
+            .where(TodoTask.id == task_id, TodoTask.owner_id == self.owner_id)
+            .cte("subtree", recursive=True)
+        )
+        subtree = subtree.union_all(
+            select(TodoTask.id, TodoTask.parent_id, subtree.c.depth + 1)
+            .join(subtree, TodoTask.parent_id == subtree.c.id)
+            .where(subtree.c.depth < max_depth)
+        )
+
+        # NOTE: closure(ancestor_id, descendant_id) pairs inside the subtree, including (id, id)
+        closure = select(subtree.c.id.label("ancestor_id"), subtree.c.id.label("descendant_id")).cte("closure", recursive=True)
+        closure = closure.union_all(
+            select(closure.c.ancestor_id, subtree.c.id).join(closure, subtree.c.parent_id == closure.c.descendant_id)
+        )
+
+        descendant = TodoTask.__table__.alias("descendant")
+        rollup = (
+            select(
+                closure.c.ancestor_id,
+                (func.count() - 1).label("subtasks"),
+                func.sum(
+                    case(
+                        (
+                            (descendant.c.status == TodoStatus.COMPLETED) & (descendant.c.id != closure.c.ancestor_id),
+                            1,
+                        ),
+                        else_=0,
+                    )
+                ).label("completed_subtasks"),
+            )
+            .join(descendant, descendant.c.id == closure.c.descendant_id)
+            .group_by(closure.c.ancestor_id)
+            .subquery("rollup")
+        )
+
+        stmt = (
+            select(
+                TodoTask.id,
+                TodoTask.title,
+                TodoTask.description,
+                TodoTask.status,
+                TodoTask.version,
+                TodoTask.parent_id,
+                subtree.c.depth,
+                rollup.c.subtasks,
+                rollup.c.completed_subtasks,
+            )
+            .join(subtree, subtree.c.id == TodoTask.id)
+            .join(rollup, rollup.c.ancestor_id == TodoTask.id)
+            .order_by(subtree.c.depth, TodoTask.id)
+            .execution_options(yield_per=batch_size)
+        )
+
+        result = await self._session.stream(stmt)
+
+        async for row in result:
+            yield row
+
+    async def get_tree(self, task_id: int, max_depth: int, batch_size: int) -> AsyncIterator[Row[Any]]:
+        """
+        Get the task and its subtasks as a stream of rows
+
+        Rows come parents first (ordered by depth, id) with ``depth`` relative to the task and
+        ``subtasks`` / ``completed_subtasks`` rollups over descendants within ``max_depth``.
+        The first row is fetched right away, so a missing task raises before anything is streamed.
+
+        :param task_id: root task id
+        :param max_depth: max depth of returned descendants (0 - the task only)
+        :param batch_size: rows fetched from the database cursor at once
+        """
+        rows = self._stream_tree(task_id, max_depth, batch_size)
+
+        try:
+            first = await rows.__anext__()
+
+        except StopAsyncIteration:
+            self._raise_not_found(task_id)
+
+        async def chain() -> AsyncIterator[Row[Any]]:
+            yield first
+
+            async for row in rows:
+                yield row
+
+        return chain()
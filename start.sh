@@ -6,4 +6,6 @@ echo "Running migrations..."
 alembic upgrade head
 
 echo "Starting app..."
-uvicorn main:app --host 0.0.0.0 --port 8000
+# NOTE: APP_WORKERS=0 - one worker per CPU
+export APP_WORKERS=${APP_WORKERS:-0}
+exec python server.py
@@ -2,18 +2,23 @@ from typing import AsyncGenerator
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from main import app
+from src.core.audit import audit_writer
+from src.core.cache import generations, response_cache
+from src.core.config import config
 from src.database.models import BaseModel
 from src.depends.session import get_session
 
 ASYNC_DATABASE_URL = "sqlite+aiosqlite:///./test.db"
 
+# NOTE: test client requests are made on behalf of this owner
+OWNER_ID = "test-user"
+
 
 async_engine = create_async_engine(ASYNC_DATABASE_URL)
-SessionMaker = sessionmaker(async_engine, autoflush=False, class_=AsyncSession, expire_on_commit=False)
+SessionMaker = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 async_engine.echo = True
 
@@ -25,6 +30,11 @@ async def get_sqlite_session() -> AsyncGenerator[AsyncSession, None]:
 
 @pytest.fixture(scope="function")
 async def sqlite_session() -> AsyncGenerator[AsyncSession, None]:
+    # NOTE: every test starts with empty tables, so cached responses and generations start over too
+    response_cache.clear()
+    generations.clear()
+    audit_writer.clear()
+
     async with async_engine.begin() as conn:
         await conn.run_sync(BaseModel.metadata.create_all)
         async with SessionMaker() as session:
@@ -37,4 +47,4 @@ app.dependency_overrides[get_session] = get_sqlite_session
 
 @pytest.fixture(scope="session")
 def test_client():
-    return TestClient(app)
+    return TestClient(app, headers={config.OWNER_HEADER: OWNER_ID})
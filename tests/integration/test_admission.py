@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.core.admission import AdmissionLimiter, admission
+from tests.fixtures import test_client  # noqa: F401
+
+
+@pytest.mark.asyncio
+async def test_limiter_sheds_when_queue_is_full():
+    limiter = AdmissionLimiter("GET /test", limit=1, queue_size=0, queue_timeout=1.0)
+
+    assert await limiter.acquire()
+
+    # NOTE: слот занят, очередь нулевая - запрос сразу отбрасывается
+    assert not await limiter.acquire()
+    assert limiter.shed == 1
+
+    limiter.release()
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_limiter_sheds_after_deadline():
+    limiter = AdmissionLimiter("GET /test", limit=1, queue_size=1, queue_timeout=0.01)
+
+    assert await limiter.acquire()
+
+    # NOTE: запрос ждет в очереди и отбрасывается по дедлайну
+    assert not await limiter.acquire()
+    assert limiter.shed == 1
+    assert limiter.queue_depth == 0
+
+
+@pytest.mark.asyncio
+async def test_limiter_hands_slot_to_waiter():
+    limiter = AdmissionLimiter("GET /test", limit=1, queue_size=1, queue_timeout=1.0)
+
+    assert await limiter.acquire()
+
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    assert limiter.queue_depth == 1
+
+    # NOTE: освобожденный слот переходит к ожидающему запросу
+    limiter.release()
+    assert await waiter
+    assert limiter.in_flight == 1
+    assert limiter.queue_depth == 0
+
+
+def test_admission_metrics(test_client: TestClient):
+    response = test_client.get("/metrics/admission")
+    assert response.status_code == 200
+
+    data = response.json()
+
+    assert {"shed", "queue_depth", "pool_timeouts", "routes"} <= data.keys()
+
+
+def test_overloaded_route_returns_503(test_client: TestClient):
+    limiter = admission.get_limiter("GET /api/v1/tasks")
+    limit, queue_size = limiter.limit, limiter.queue_size
+
+    # NOTE: нет свободных слотов и очереди - запрос должен быть сразу отброшен
+    limiter.limit, limiter.queue_size = 0, 0
+
+    try:
+        response = test_client.get("/api/v1/tasks")
+    finally:
+        limiter.limit, limiter.queue_size = limit, queue_size
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(admission.retry_after)
+    assert admission.stats()["routes"]["GET /api/v1/tasks"]["shed"] >= 1
@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+from src.middleware import CancelOnDisconnectMiddleware
+
+SCOPE = {"type": "http", "method": "GET", "path": "/api/v1/tasks"}
+
+
+def make_receive(disconnect_after: float):
+    messages = [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive():
+        if messages:
+            return messages.pop()
+
+        await asyncio.sleep(disconnect_after)
+        return {"type": "http.disconnect"}
+
+    return receive
+
+
+async def noop_send(_):
+    pass
+
+
+@pytest.mark.asyncio
+async def test_request_cancelled_on_disconnect():
+    cancelled = asyncio.Event()
+
+    async def slow_app(scope, receive, send):
+        await receive()
+
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    middleware = CancelOnDisconnectMiddleware(slow_app)
+
+    # NOTE: клиент отключается раньше, чем приложение успевает ответить
+    await asyncio.wait_for(middleware(SCOPE, make_receive(0.01), noop_send), timeout=1)
+
+    assert cancelled.is_set()
+
+
+@pytest.mark.asyncio
+async def test_completed_response_not_cancelled():
+    finished = asyncio.Event()
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+        # NOTE: фоновая работа после ответа не должна отменяться при отключении клиента
+        await asyncio.sleep(0.05)
+        finished.set()
+
+    middleware = CancelOnDisconnectMiddleware(app)
+    await middleware(SCOPE, make_receive(0.01), noop_send)
+
+    assert finished.is_set()
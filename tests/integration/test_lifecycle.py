@@ -0,0 +1,76 @@
+import asyncio
+import signal
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.pool import QueuePool
+
+from src.core.lifecycle import Lifecycle, lifecycle
+from src.database.connection import warm_up_engine
+from tests.fixtures import async_engine, sqlite_session, test_client  # noqa: F401
+
+
+def test_readyz(test_client: TestClient):
+    # NOTE: lifespan в тестах не запускается - до прогрева сервис не готов
+    response = test_client.get("/readyz")
+    assert response.status_code == 503
+
+    lifecycle.ready = True
+
+    try:
+        response = test_client.get("/readyz")
+    finally:
+        lifecycle.ready = False
+
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_warm_up_engine(sqlite_session: AsyncSession):
+    await warm_up_engine(async_engine, 2)
+
+    # NOTE: прогретые соединения остаются в пуле
+    assert isinstance(async_engine.pool, QueuePool)
+    assert async_engine.pool.checkedin() >= 1
+
+
+@pytest.mark.asyncio
+async def test_drain_waits_for_in_flight_requests():
+    state = Lifecycle()
+    state.ready = True
+    state.request_started()
+
+    async def finish_request():
+        await asyncio.sleep(0.01)
+        state.request_finished()
+
+    task = asyncio.create_task(finish_request())
+    await state.drain(timeout=1)
+
+    assert not state.ready
+    assert state.in_flight == 0
+    await task
+
+
+@pytest.mark.asyncio
+async def test_signal_turns_not_ready_before_shutdown():
+    received: list[int] = []
+    previous = signal.signal(signal.SIGUSR1, lambda sig, frame: received.append(sig))
+
+    state = Lifecycle()
+    state.ready = True
+
+    try:
+        state.install_signal_handlers(delay=0.05, signals=(signal.SIGUSR1,))
+        signal.raise_signal(signal.SIGUSR1)
+
+        # NOTE: готовность снимается сразу, а сигнал доходит до сервера только после задержки
+        assert not state.ready
+        await asyncio.sleep(0.01)
+        assert received == []
+
+        await asyncio.sleep(0.1)
+        assert received == [signal.SIGUSR1]
+    finally:
+        signal.signal(signal.SIGUSR1, previous)
@@ -0,0 +1,92 @@
+import json
+import logging
+import queue
+
+from fastapi.testclient import TestClient
+
+from src.core.log import (
+    UVICORN_LOGGERS,
+    DebugSamplingFilter,
+    JsonFormatter,
+    NonBlockingQueueHandler,
+    RequestIdFilter,
+    request_id_var,
+    setup_logging,
+)
+from tests.fixtures import test_client  # noqa: F401
+
+
+def make_record(level: int = logging.INFO) -> logging.LogRecord:
+    return logging.LogRecord("test", level, __file__, 1, "Creating %s with data: %s", ("TodoTask", {"title": "x"}), None)
+
+
+def test_queue_handler_defers_formatting_and_drops_when_full():
+    log_queue: queue.Queue = queue.Queue(maxsize=1)
+    handler = NonBlockingQueueHandler(log_queue)
+
+    handler.handle(make_record())
+    handler.handle(make_record())
+
+    # NOTE: сообщение не форматируется в вызывающем потоке, лишние записи отбрасываются без блокировки
+    record = log_queue.get_nowait()
+    assert record.msg == "Creating %s with data: %s"
+    assert handler.dropped == 1
+
+
+def test_json_formatter_with_request_id():
+    token = request_id_var.set("request-1")
+
+    try:
+        record = make_record()
+        RequestIdFilter().filter(record)
+    finally:
+        request_id_var.reset(token)
+
+    entry = json.loads(JsonFormatter().format(record))
+
+    assert entry["message"] == "Creating TodoTask with data: {'title': 'x'}"
+    assert entry["request_id"] == "request-1"
+    assert entry["level"] == "INFO"
+
+
+def test_debug_sampling():
+    sampling = DebugSamplingFilter(rate=0.0)
+
+    assert not sampling.filter(make_record(logging.DEBUG))
+    assert sampling.filter(make_record(logging.WARNING))
+
+
+def test_uvicorn_loggers_go_through_queue():
+    root = logging.getLogger()
+    root_handlers, root_level = root.handlers, root.level
+
+    access = logging.getLogger("uvicorn.access")
+    access.addHandler(logging.StreamHandler())
+    access.propagate = False
+
+    listener = setup_logging()
+
+    try:
+        # NOTE: у логгеров uvicorn не остается своих синхронных обработчиков, записи уходят в очередь root
+        for name in UVICORN_LOGGERS:
+            assert not logging.getLogger(name).handlers
+            assert logging.getLogger(name).propagate
+
+        assert isinstance(root.handlers[0], NonBlockingQueueHandler)
+    finally:
+        listener.stop()
+        root.handlers, root.level = root_handlers, root_level
+
+
+def test_request_id_header(test_client: TestClient):
+    response = test_client.get("/readyz", headers={"X-Request-ID": "request-2"})
+    assert response.headers["X-Request-ID"] == "request-2"
+
+    response = test_client.get("/readyz")
+    assert response.headers["X-Request-ID"]
+
+    # NOTE: слишком длинный или с посторонними символами id не доверяем - генерируется новый
+    for request_id in ("a" * 129, "request 3", "request\u00e9"):
+        response = test_client.get("/readyz", headers={"X-Request-ID": request_id.encode("utf-8")})
+        assert response.headers["X-Request-ID"] != request_id
+        assert len(response.headers["X-Request-ID"]) == 32
@@ -0,0 +1,34 @@
+import pytest
+
+from src.core.config import config, get_pool_limits
+
+
+@pytest.fixture
+def pool_config(monkeypatch):
+    monkeypatch.setattr(config, "DB_POOL_SIZE", 5)
+    monkeypatch.setattr(config, "DB_MAX_OVERFLOW", 10)
+    return monkeypatch
+
+
+def test_pool_limits_without_budget(pool_config):
+    pool_config.setattr(config, "DB_MAX_CONNECTIONS", 0)
+
+    assert get_pool_limits() == (5, 10)
+
+
+def test_pool_limits_split_budget_between_workers(pool_config):
+    pool_config.setattr(config, "DB_MAX_CONNECTIONS", 40)
+    pool_config.setattr(config, "APP_WORKERS", 8)
+
+    pool_size, max_overflow = get_pool_limits()
+
+    # NOTE: все воркеры вместе не превышают общий лимит соединений
+    assert (pool_size + max_overflow) * 8 <= 40
+    assert pool_size == 5
+
+
+def test_pool_limits_small_budget(pool_config):
+    pool_config.setattr(config, "DB_MAX_CONNECTIONS", 4)
+    pool_config.setattr(config, "APP_WORKERS", 8)
+
+    assert get_pool_limits() == (1, 0)
@@ -0,0 +1,68 @@
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from main import app
+from src.core.config import config
+from src.middleware import ProfilingMiddleware
+from tests.fixtures import OWNER_ID, sqlite_session  # noqa: F401
+
+
+def make_client(output_dir, sample_rate: float = 0.0) -> TestClient:
+    profiled_app = ProfilingMiddleware(
+        app,
+        header="X-Profile",
+        sample_rate=sample_rate,
+        output_dir=str(output_dir),
+        profile_format="collapsed",
+        interval=0.0005,
+    )
+    return TestClient(profiled_app, headers={config.OWNER_HEADER: OWNER_ID})
+
+
+def test_inline_profile(tmp_path, sqlite_session: AsyncSession):
+    client = make_client(tmp_path)
+
+    response = client.get("/api/v1/tasks", headers={"X-Profile": "inline"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+
+    # NOTE: вместо ответа возвращается профиль в формате collapsed stacks: "frame;frame;... count"
+    for line in response.text.splitlines():
+        stack, count = line.rsplit(" ", 1)
+        assert stack
+        assert int(count) > 0
+
+
+def test_profile_written_to_directory(tmp_path, sqlite_session: AsyncSession):
+    client = make_client(tmp_path, sample_rate=1.0)
+
+    response = client.get("/api/v1/tasks")
+    assert response.status_code == 200
+    assert response.json() == []
+
+    assert len(list(tmp_path.glob("*GET_api_v1_tasks.collapsed"))) == 1
+
+
+def test_not_profiled_without_header(tmp_path, sqlite_session: AsyncSession):
+    client = make_client(tmp_path)
+
+    response = client.get("/api/v1/tasks")
+    assert response.status_code == 200
+
+    assert not list(tmp_path.iterdir())
+
+
+def test_profile_header_values(tmp_path, sqlite_session: AsyncSession):
+    client = make_client(tmp_path)
+
+    # NOTE: неизвестные значения заголовка игнорируются - запрос не профилируется и на диск ничего не пишется
+    for value in ("yes", "../../tmp", "html"):
+        response = client.get("/api/v1/tasks", headers={"X-Profile": value})
+        assert response.status_code == 200
+        assert response.json() == []
+
+    assert not list(tmp_path.iterdir())
+
+    response = client.get("/api/v1/tasks", headers={"X-Profile": "file"})
+    assert response.json() == []
+    assert len(list(tmp_path.glob("*GET_api_v1_tasks.collapsed"))) == 1
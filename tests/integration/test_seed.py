@@ -0,0 +1,69 @@
+from dataclasses import replace
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import create_engine, delete, func, select
+
+from seed import ResumeMismatchError, SeedOptions, seed, seed_progress
+from src.database.models import BaseModel, TodoTask
+from src.enums import TodoStatus
+
+
+def make_options(database_url: str, rows: int) -> SeedOptions:
+    return SeedOptions(
+        database_url=database_url,
+        run_id="test",
+        rows=rows,
+        owners=3,
+        chunk_size=40,
+        batch_size=15,
+        workers=1,
+        status_weights={TodoStatus.PENDING: 1, TodoStatus.COMPLETED: 1},
+        title_length=20,
+        description_length=50,
+        days=30,
+        seed=1,
+        until=datetime(2024, 1, 1, tzinfo=timezone.utc),
+    )
+
+
+def test_seed_and_resume(tmp_path):
+    database_url = f"sqlite:///{tmp_path / 'seed.db'}"
+    engine = create_engine(database_url)
+    BaseModel.metadata.create_all(engine)
+
+    assert seed(make_options(database_url, 100)) == 100
+
+    # NOTE: имитируем прерванный запуск - последний чанк не записан
+    with engine.begin() as connection:
+        connection.execute(delete(TodoTask).where(TodoTask.id > 80))
+        connection.execute(delete(seed_progress).where(seed_progress.c.chunk == 2))
+
+    # NOTE: повторный запуск с тем же run_id дописывает только недостающие чанки
+    assert seed(make_options(database_url, 100)) == 20
+    assert seed(make_options(database_url, 100)) == 0
+
+    with engine.connect() as connection:
+        assert connection.scalar(select(func.count()).select_from(TodoTask)) == 100
+
+        owners = set(connection.scalars(select(TodoTask.owner_id).distinct()))
+        assert owners <= {"user-0", "user-1", "user-2"}
+
+        statuses = set(connection.scalars(select(TodoTask.status).distinct()))
+        assert statuses <= {TodoStatus.PENDING, TodoStatus.COMPLETED}
+
+
+def test_resume_with_other_options(tmp_path):
+    database_url = f"sqlite:///{tmp_path / 'seed.db'}"
+    BaseModel.metadata.create_all(create_engine(database_url))
+
+    options = make_options(database_url, 100)
+    assert seed(options) == 100
+
+    # NOTE: другие параметры генерации с тем же run_id дали бы другие/пересекающиеся данные - запуск отклоняется
+    for changed in (replace(options, chunk_size=30), replace(options, rows=200), replace(options, seed=2)):
+        with pytest.raises(ResumeMismatchError):
+            seed(changed)
+
+    # NOTE: число процессов и размер пачки на данные не влияют
+    assert seed(replace(options, workers=2, batch_size=10)) == 0
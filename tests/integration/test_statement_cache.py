@@ -0,0 +1,76 @@
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.repo import Repository
+from src.core.repo.generic import _statement_cache
+from src.database.models import TodoTask
+from src.database.stats import StatementCacheStats
+from src.enums import TodoStatus
+from src.services import TodoTasksService
+from tests.fixtures import OWNER_ID, async_engine, sqlite_session  # noqa: F401
+
+
+@pytest.mark.asyncio
+async def test_filter_uses_cached_statement(sqlite_session: AsyncSession):
+    repo = Repository(TodoTask, sqlite_session, {"owner_id": OWNER_ID})
+
+    await repo.create(TodoTask(title="test_title_1", description="test_description_1"))
+    await repo.create(TodoTask(title="test_title_2", description="test_description_2", status=TodoStatus.COMPLETED))
+    await repo.commit()
+
+    key = (TodoTask, "filter", ("owner_id", "status"), ())
+    _statement_cache.pop(key, None)
+
+    stats = StatementCacheStats()
+    stats.track(async_engine)
+
+    try:
+        completed = (await repo.filter(status=TodoStatus.COMPLETED)).all()
+
+        # NOTE: statement построен через кэш репозитория
+        statement = _statement_cache[key]
+        hits, misses = stats.hits, stats.misses
+
+        pending = (await repo.filter(status=TodoStatus.PENDING)).all()
+    finally:
+        stats.untrack(async_engine)
+
+    assert [record.title for record in completed] == ["test_title_2"]
+    assert [record.title for record in pending] == ["test_title_1"]
+
+    # NOTE: та же форма запроса с другими значениями - тот же statement и попадание в compiled cache
+    assert _statement_cache[key] is statement
+    assert stats.hits > hits
+    assert stats.misses == misses
+
+
+@pytest.mark.asyncio
+async def test_statement_cache_stats(sqlite_session: AsyncSession):
+    stats = StatementCacheStats()
+    stats.track(async_engine)
+
+    repo = Repository(TodoTask, sqlite_session, {"owner_id": OWNER_ID})
+
+    try:
+        for _ in range(3):
+            await repo.all()
+    finally:
+        stats.untrack(async_engine)
+
+    # NOTE: первый запрос компилируется, последующие берутся из кэша
+    assert stats.hits >= 2
+    assert stats.hit_ratio > 0
+
+
+@pytest.mark.asyncio
+async def test_task_list_uses_cached_statement(sqlite_session: AsyncSession):
+    service = TodoTasksService(sqlite_session, OWNER_ID)
+    key = (TodoTask, "where", ("list", True, True), ("owner_id",))
+    _statement_cache.pop(key, None)
+
+    assert await service.get_all(["work"], TodoStatus.PENDING) == []
+    statement = _statement_cache[key]
+
+    # NOTE: другие теги и статус - те же bindparams, statement не перестраивается
+    assert await service.get_all(["home", "urgent"], TodoStatus.COMPLETED) == []
+    assert _statement_cache[key] is statement
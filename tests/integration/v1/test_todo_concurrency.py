@@ -0,0 +1,127 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api.v1.schamas import TodoTaskUpdate
+from src.core.exceptions import PreconditionFailedError
+from src.core.repo import Repository
+from src.database.models import TodoTask
+from src.enums import TodoStatus
+from src.services import TodoTasksService
+from tests.fixtures import OWNER_ID, SessionMaker, sqlite_session, test_client  # noqa: F401
+
+UPDATE_DATA = {
+    "title": "test_title",
+    "description": "test_description",
+    "status": "in_progress",
+}
+
+
+@pytest.mark.asyncio
+async def test_update_with_matching_version(test_client: TestClient, sqlite_session: AsyncSession):
+    repo = Repository(TodoTask, sqlite_session, {"owner_id": OWNER_ID})
+    await repo.create(TodoTask(title="test_title", description="test_description"))
+    await repo.commit()
+
+    response = test_client.get("/api/v1/tasks/1")
+    assert response.status_code == 200
+    assert response.headers["ETag"] == '"1"'
+
+    # NOTE: версия совпадает - запись обновляется, версия увеличивается
+    response = test_client.put("/api/v1/tasks/1", json=UPDATE_DATA, headers={"If-Match": response.headers["ETag"]})
+    assert response.status_code == 200
+    assert response.headers["ETag"] == '"2"'
+    assert response.json()["version"] == 2
+
+    sqlite_session.expire_all()
+    record_db = await repo.get_by_pk(1)
+
+    assert record_db is not None
+    assert record_db.version == 2
+    assert record_db.status == TodoStatus.IN_PROGRESS
+
+
+@pytest.mark.asyncio
+async def test_update_with_stale_version(test_client: TestClient, sqlite_session: AsyncSession):
+    repo = Repository(TodoTask, sqlite_session, {"owner_id": OWNER_ID})
+    await repo.create(TodoTask(title="test_title", description="test_description"))
+    await repo.commit()
+
+    response = test_client.put("/api/v1/tasks/1", json=UPDATE_DATA, headers={"If-Match": '"1"'})
+    assert response.status_code == 200
+
+    # NOTE: второй клиент пишет со старой версией - получает 412, запись не меняется
+    response = test_client.put("/api/v1/tasks/1", json={**UPDATE_DATA, "status": "completed"}, headers={"If-Match": '"1"'})
+    assert response.status_code == 412
+
+    sqlite_session.expire_all()
+    record_db = await repo.get_by_pk(1)
+
+    assert record_db is not None
+    assert record_db.version == 2
+    assert record_db.status == TodoStatus.IN_PROGRESS
+
+
+@pytest.mark.asyncio
+async def test_update_with_invalid_if_match(test_client: TestClient, sqlite_session: AsyncSession):
+    repo = Repository(TodoTask, sqlite_session, {"owner_id": OWNER_ID})
+    await repo.create(TodoTask(title="test_title", description="test_description"))
+    await repo.commit()
+
+    response = test_client.put("/api/v1/tasks/1", json=UPDATE_DATA, headers={"If-Match": "not-a-version"})
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_delete_with_stale_version(test_client: TestClient, sqlite_session: AsyncSession):
+    repo = Repository(TodoTask, sqlite_session, {"owner_id": OWNER_ID})
+    await repo.create(TodoTask(title="test_title", description="test_description"))
+    await repo.commit()
+
+    assert test_client.put("/api/v1/tasks/1", json=UPDATE_DATA).status_code == 200
+
+    # NOTE: удаление со старой версией - 412, задача остается
+    response = test_client.delete("/api/v1/tasks/1", headers={"If-Match": '"1"'})
+    assert response.status_code == 412
+    assert test_client.get("/api/v1/tasks/1").status_code == 200
+
+    response = test_client.delete("/api/v1/tasks/1", headers={"If-Match": '"2"'})
+    assert response.status_code == 200
+    assert test_client.get("/api/v1/tasks/1").status_code == 404
+
+
+async def load_and_bump_version(sqlite_session: AsyncSession) -> TodoTasksService:
+    """Create a task, load it into the service session and change its version in another transaction"""
+    repo = Repository(TodoTask, sqlite_session, {"owner_id": OWNER_ID})
+    await repo.create(TodoTask(title="test_title", description="test_description"))
+    await repo.commit()
+
+    service = TodoTasksService(sqlite_session, OWNER_ID)
+    assert (await service.get_by_id(1)).version == 1
+
+    async with SessionMaker() as session, session.begin():
+        await session.execute(update(TodoTask).where(TodoTask.id == 1).values(version=TodoTask.version + 1))
+
+    return service
+
+
+@pytest.mark.asyncio
+async def test_update_conflict_between_load_and_flush(sqlite_session: AsyncSession):
+    service = await load_and_bump_version(sqlite_session)
+
+    # NOTE: проверка версии в Python проходит (загружена версия 1), конфликт ловит условный UPDATE при flush
+    with pytest.raises(PreconditionFailedError):
+        await service.update(1, TodoTaskUpdate.model_validate(UPDATE_DATA), version=1)
+
+
+@pytest.mark.asyncio
+async def test_delete_conflict_between_load_and_flush(sqlite_session: AsyncSession):
+    service = await load_and_bump_version(sqlite_session)
+
+    # NOTE: условный DELETE выполняется сразу, а не при коммите после ответа
+    with pytest.raises(PreconditionFailedError):
+        await service.delete(1, version=1)
+
+    await sqlite_session.rollback()
+    assert await sqlite_session.scalar(select(func.count()).select_from(TodoTask)) == 1
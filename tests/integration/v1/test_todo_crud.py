@@ -5,7 +5,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from src.core.repo import Repository
 from src.database.models import TodoTask
 from src.enums import TodoStatus
-from tests.fixtures import sqlite_session, test_client  # noqa: F401
+from tests.fixtures import OWNER_ID, sqlite_session, test_client  # noqa: F401
 
 
 @pytest.mark.asyncio
@@ -35,7 +35,7 @@ async def test_get_all_todos(test_client: TestClient, sqlite_session: AsyncSessi
         TodoTask(title="test_title_3", description="test_description_3"),
     ]
 
-    repo = Repository(TodoTask, sqlite_session)
+    repo = Repository(TodoTask, sqlite_session, {"owner_id": OWNER_ID})
 
     for record in records:
         await repo.create(record)
@@ -70,7 +70,7 @@ async def test_get_todo_by_id(test_client: TestClient, sqlite_session: AsyncSess
         TodoTask(title="test_title_3", description="test_description_3"),
     ]
 
-    repo = Repository(TodoTask, sqlite_session)
+    repo = Repository(TodoTask, sqlite_session, {"owner_id": OWNER_ID})
 
     for record in records:
         await repo.create(record)
@@ -99,7 +99,7 @@ async def test_update_todo(test_client: TestClient, sqlite_session: AsyncSession
         TodoTask(title="test_title_3", description="test_description_3"),
     ]
 
-    repo = Repository(TodoTask, sqlite_session)
+    repo = Repository(TodoTask, sqlite_session, {"owner_id": OWNER_ID})
 
     for record in records:
         await repo.create(record)
@@ -142,7 +142,7 @@ async def test_delete_todo(test_client: TestClient, sqlite_session: AsyncSession
         TodoTask(title="test_title_3", description="test_description_3"),
     ]
 
-    repo = Repository(TodoTask, sqlite_session)
+    repo = Repository(TodoTask, sqlite_session, {"owner_id": OWNER_ID})
 
     for record in records:
         await repo.create(record)
@@ -165,7 +165,7 @@ async def test_delete_todo(test_client: TestClient, sqlite_session: AsyncSession
 async def test_bad_create_request(test_client: TestClient, sqlite_session: AsyncSession):
     record = TodoTask(title="test_title", description="test_description")
 
-    repo = Repository(TodoTask, sqlite_session)
+    repo = Repository(TodoTask, sqlite_session, {"owner_id": OWNER_ID})
     await repo.create(record)
     await repo.commit()
 
@@ -0,0 +1,137 @@
+import asyncio
+from datetime import datetime, timezone
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.audit import AuditWriter, audit_writer
+from src.core.exceptions import ServiceOverloadedError
+from src.database import TaskHistory
+from src.enums import HistoryAction, TodoStatus
+from tests.fixtures import OWNER_ID, SessionMaker, sqlite_session, test_client  # noqa: F401
+
+
+def make_event() -> dict[str, Any]:
+    return {
+        "owner_id": OWNER_ID,
+        "record_id": 1,
+        "action": HistoryAction.CREATE,
+        "before": None,
+        "after": {},
+        "created_at": datetime.now(timezone.utc),
+    }
+
+
+@pytest.mark.asyncio
+async def test_task_history(test_client: TestClient, sqlite_session: AsyncSession):
+    audit_writer.start(SessionMaker)
+
+    response = test_client.post("/api/v1/tasks", json={"title": "test_title", "description": "test_description", "tags": ["work"]})
+    task_id = response.json()["id"]
+
+    data = {"title": "new_title", "description": "test_description", "status": TodoStatus.COMPLETED}
+    assert test_client.put(f"/api/v1/tasks/{task_id}", json=data).status_code == 200
+    assert test_client.delete(f"/api/v1/tasks/{task_id}").status_code == 200
+
+    # NOTE: события пишутся в фоне пачками, до сброса буфера истории еще нет
+    assert audit_writer.buffered == 3
+    assert test_client.get(f"/api/v1/tasks/{task_id}/history").json() == []
+
+    await audit_writer.stop()
+    assert audit_writer.buffered == 0
+
+    history = test_client.get(f"/api/v1/tasks/{task_id}/history").json()
+    assert [item["action"] for item in history] == [HistoryAction.DELETE, HistoryAction.UPDATE, HistoryAction.CREATE]
+    assert all(item["task_id"] == task_id for item in history)
+
+    delete, update, create = history
+    assert create["before"] is None
+    assert create["after"]["title"] == "test_title"
+    assert create["after"]["tags"] == ["work"]
+    assert update["before"]["title"] == "test_title"
+    assert update["after"]["title"] == "new_title"
+    assert update["after"]["status"] == TodoStatus.COMPLETED
+    assert update["after"]["version"] == 2
+    assert delete["before"]["title"] == "new_title"
+    assert delete["after"] is None
+
+    # NOTE: постраничная выдача по id последней записи
+    page = test_client.get(f"/api/v1/tasks/{task_id}/history", params={"limit": 2}).json()
+    assert [item["id"] for item in page] == [delete["id"], update["id"]]
+
+    page = test_client.get(f"/api/v1/tasks/{task_id}/history", params={"limit": 2, "before": page[-1]["id"]}).json()
+    assert [item["id"] for item in page] == [create["id"]]
+
+
+@pytest.mark.asyncio
+async def test_history_discarded_on_rollback(sqlite_session: AsyncSession):
+    writer = AuditWriter(enabled=True, buffer_size=10, batch_size=10, flush_interval=1.0, backpressure_timeout=0.1)
+
+    async with SessionMaker() as session:
+        await session.begin()
+        writer.record(session, TaskHistory, {"record_id": 1, "action": HistoryAction.CREATE, "before": None, "after": {}})
+        await session.rollback()
+
+    assert writer.buffered == 0
+    assert audit_writer.buffered == 0
+
+
+@pytest.mark.asyncio
+async def test_history_backpressure(sqlite_session: AsyncSession):
+    writer = AuditWriter(enabled=True, buffer_size=1, batch_size=10, flush_interval=1.0, backpressure_timeout=0.05)
+
+    async with SessionMaker() as first, SessionMaker() as second:
+        await first.begin()
+        await writer.wait_for_capacity(first)
+
+        # NOTE: место зарезервировано первой транзакцией, хотя буфер еще пуст - вторая запись получает отказ (503)
+        with pytest.raises(ServiceOverloadedError):
+            await writer.wait_for_capacity(second)
+
+        assert writer.stats()["rejected"] == 1
+
+        # NOTE: резерв освобождается с концом транзакции (здесь - при закрытии сессии)
+        await first.close()
+        await writer.wait_for_capacity(second)
+
+
+@pytest.mark.asyncio
+async def test_history_backpressure_wakes_up_on_flush(sqlite_session: AsyncSession):
+    writer = AuditWriter(enabled=True, buffer_size=1, batch_size=10, flush_interval=1.0, backpressure_timeout=1.0)
+    writer.start(SessionMaker)
+    writer.enqueue([(TaskHistory, make_event())])
+
+    async with SessionMaker() as session:
+        waiter = asyncio.create_task(writer.wait_for_capacity(session))
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+
+        # NOTE: ожидающая запись просыпается сразу после сброса буфера, а не по опросу
+        await writer.flush()
+        await asyncio.wait_for(waiter, 0.1)
+
+    await writer.stop()
+
+
+@pytest.mark.asyncio
+async def test_history_poison_batch_is_dead_lettered(sqlite_session: AsyncSession):
+    writer = AuditWriter(enabled=True, buffer_size=10, batch_size=10, flush_interval=1.0, backpressure_timeout=0.05, max_retries=2)
+    writer.start(SessionMaker)
+
+    good = make_event()
+    writer.enqueue([(TaskHistory, good), (TaskHistory, {**good, "action": None}), (TaskHistory, good)])
+
+    # NOTE: пачка с битой строкой повторяется max_retries раз и не пишется целиком
+    assert await writer.flush() == 0
+    assert await writer.flush() == 0
+    assert writer.buffered == 3
+
+    # NOTE: затем делится пополам до отдельных строк - битая уходит в dead letters, остальные пишутся
+    assert await writer.flush() == 2
+    assert writer.buffered == 0
+    assert writer.stats()["dead_lettered"] == 1
+    assert writer.dead_letters[0][1]["action"] is None
+
+    await writer.stop()
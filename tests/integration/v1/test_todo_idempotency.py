@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from main import app
+from src.core.config import config
+from src.database import IdempotencyKey, TodoTask
+from src.services.idempotency import IdempotencyPurger
+from tests.fixtures import OWNER_ID, SessionMaker, sqlite_session, test_client  # noqa: F401
+
+DATA = {"title": "test_title", "description": "test_description"}
+
+
+async def count(session: AsyncSession, model: type) -> int:
+    return await session.scalar(select(func.count()).select_from(model)) or 0
+
+
+@pytest.mark.asyncio
+async def test_idempotent_create(test_client: TestClient, sqlite_session: AsyncSession):
+    first = test_client.post("/api/v1/tasks", json=DATA, headers={"Idempotency-Key": "key-1"})
+    assert first.status_code == 201
+    assert "Idempotent-Replayed" not in first.headers
+
+    # NOTE: повтор с тем же ключом получает сохраненный ответ, новая задача не создается
+    retry = test_client.post("/api/v1/tasks", json=DATA, headers={"Idempotency-Key": "key-1"})
+    assert retry.status_code == 201
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.headers["ETag"] == first.headers["ETag"]
+    assert retry.json() == first.json()
+
+    assert await count(sqlite_session, TodoTask) == 1
+
+    # NOTE: другой ключ или другой владелец - новый запрос
+    assert test_client.post("/api/v1/tasks", json=DATA, headers={"Idempotency-Key": "key-2"}).json()["id"] != first.json()["id"]
+
+    headers = {"Idempotency-Key": "key-1", config.OWNER_HEADER: "other-user"}
+    assert test_client.post("/api/v1/tasks", json=DATA, headers=headers).json()["id"] != first.json()["id"]
+
+    assert await count(sqlite_session, TodoTask) == 3
+
+
+@pytest.mark.asyncio
+async def test_idempotency_key_reused_for_another_request(test_client: TestClient, sqlite_session: AsyncSession):
+    assert test_client.post("/api/v1/tasks", json=DATA, headers={"Idempotency-Key": "key-1"}).status_code == 201
+
+    response = test_client.post("/api/v1/tasks", json={**DATA, "title": "other"}, headers={"Idempotency-Key": "key-1"})
+    assert response.status_code == 422
+    assert await count(sqlite_session, TodoTask) == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_request_releases_key(test_client: TestClient, sqlite_session: AsyncSession):
+    # NOTE: ошибка откатывает транзакцию вместе с ключом - повтор выполняется заново
+    response = test_client.post("/api/v1/tasks", json={**DATA, "parent_id": 42}, headers={"Idempotency-Key": "key-1"})
+    assert response.status_code == 404
+    assert await count(sqlite_session, IdempotencyKey) == 0
+
+    response = test_client.post("/api/v1/tasks", json={**DATA, "parent_id": 42}, headers={"Idempotency-Key": "key-1"})
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_failed_commit_is_not_created(sqlite_session: AsyncSession):
+    def fail(_: Session) -> None:
+        raise RuntimeError("commit failed")
+
+    client = TestClient(app, headers={config.OWNER_HEADER: OWNER_ID}, raise_server_exceptions=False)
+    event.listen(Session, "before_commit", fail)
+
+    try:
+        response = client.post("/api/v1/tasks", json=DATA, headers={"Idempotency-Key": "key-1"})
+    finally:
+        event.remove(Session, "before_commit", fail)
+
+    # NOTE: коммит выполняется до ответа - клиент не получает 201 и сохраненный ответ для отката
+    assert response.status_code == 500
+    assert await count(sqlite_session, TodoTask) == 0
+    assert await count(sqlite_session, IdempotencyKey) == 0
+
+
+@pytest.mark.asyncio
+async def test_expired_keys(test_client: TestClient, sqlite_session: AsyncSession):
+    for key in ("key-1", "key-2", "key-3"):
+        assert test_client.post("/api/v1/tasks", json=DATA, headers={"Idempotency-Key": key}).status_code == 201
+
+    expired = datetime.now(timezone.utc) - timedelta(seconds=1)
+    await sqlite_session.execute(update(IdempotencyKey).where(IdempotencyKey.key != "key-3").values(expires_at=expired))
+    await sqlite_session.commit()
+
+    # NOTE: просроченный ключ занимается заново
+    assert "Idempotent-Replayed" not in test_client.post("/api/v1/tasks", json=DATA, headers={"Idempotency-Key": "key-1"}).headers
+    assert await count(sqlite_session, TodoTask) == 4
+
+    # NOTE: удаление пачками, пока есть просроченные ключи
+    purger = IdempotencyPurger(interval=60.0, batch_size=1)
+    assert await purger.purge(SessionMaker) == 1
+
+    keys = set(await sqlite_session.scalars(select(IdempotencyKey.key)))
+    assert keys == {"key-1", "key-3"}
@@ -0,0 +1,114 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api.v1.schamas import TodoTaskCreate
+from src.core.cache import Generations, ResponseCache, response_cache
+from src.core.config import config, is_list_cache_enabled
+from src.services import TodoTasksService
+from tests.fixtures import OWNER_ID, sqlite_session, test_client  # noqa: F401
+
+
+@pytest.mark.asyncio
+async def test_list_cache_hit_and_invalidation(test_client: TestClient, sqlite_session: AsyncSession):
+    response = test_client.post("/api/v1/tasks", json={"title": "test_title_1", "description": "test_description_1"})
+    assert response.status_code == 201
+
+    assert len(test_client.get("/api/v1/tasks").json()) == 1
+
+    # NOTE: повторный запрос без изменений отдается из кэша
+    hits = response_cache.hits
+    assert len(test_client.get("/api/v1/tasks").json()) == 1
+    assert response_cache.hits == hits + 1
+
+    # NOTE: запись через сервис после коммита меняет поколение владельца - кэш сразу устаревает
+    response = test_client.post("/api/v1/tasks", json={"title": "test_title_2", "description": "test_description_2"})
+    assert response.status_code == 201
+    assert len(test_client.get("/api/v1/tasks").json()) == 2
+
+    response = test_client.delete(f"/api/v1/tasks/{response.json()['id']}")
+    assert response.status_code == 200
+    assert len(test_client.get("/api/v1/tasks").json()) == 1
+
+
+def test_cache_key_normalization():
+    first = ResponseCache.make_key("tasks", 1, {"b": "2", "a": "1"})
+    second = ResponseCache.make_key("tasks", 1, {"a": "1", "b": "2"})
+
+    assert first == second
+    assert first != ResponseCache.make_key("tasks", 2, {"a": "1", "b": "2"})
+
+
+def test_cache_lru_eviction():
+    cache = ResponseCache(max_entries=2, max_bytes=10, ttl=0)
+
+    cache.set("a", b"1234")
+    cache.set("b", b"1234")
+    assert cache.get("a") == b"1234"
+
+    # NOTE: превышен лимит по размеру - вытесняется давно неиспользованная запись
+    cache.set("c", b"1234")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1234"
+    assert cache.stats()["bytes"] <= 10
+
+
+def test_cache_ttl():
+    cache = ResponseCache(max_entries=2, max_bytes=10, ttl=0.01)
+
+    cache.set("a", b"1234")
+    assert cache.get("a") == b"1234"
+
+    # NOTE: запись устаревает по TTL - так видны изменения, сделанные в других воркерах
+    time.sleep(0.02)
+    assert cache.get("a") is None
+    assert cache.stats()["bytes"] == 0
+
+
+def test_generations_never_repeat():
+    state = Generations(max_entries=1)
+
+    first = state.get("tasks", "a")
+    state.bump("tasks", "a")
+    bumped = state.get("tasks", "a")
+    assert bumped != first
+
+    # NOTE: поколения разных владельцев независимы
+    assert state.get("tasks", "b") == first
+
+    # NOTE: вытесненный владелец получает поколение не меньше последнего выданного ему
+    state.bump("tasks", "b")
+    assert state.get("tasks", "a") >= bumped
+
+
+@pytest.mark.asyncio
+async def test_generation_bumped_only_on_commit(sqlite_session: AsyncSession):
+    service = TodoTasksService(sqlite_session, OWNER_ID)
+    generation = service.get_generation()
+
+    await service.create(TodoTaskCreate(title="test_title", description="test_description"))
+    assert service.get_generation() == generation
+
+    # NOTE: откат транзакции не меняет поколение
+    await sqlite_session.rollback()
+    assert service.get_generation() == generation
+
+    await service.create(TodoTaskCreate(title="test_title", description="test_description"))
+    await sqlite_session.commit()
+    assert service.get_generation() != generation
+
+
+def test_list_cache_enabled_by_worker_count(monkeypatch):
+    monkeypatch.setattr(config, "LIST_CACHE_ENABLED", None)
+    monkeypatch.setattr(config, "APP_WORKERS", 1)
+    assert is_list_cache_enabled()
+
+    # NOTE: поколения живут в процессе - с несколькими воркерами кэш по умолчанию выключен
+    monkeypatch.setattr(config, "APP_WORKERS", 4)
+    assert not is_list_cache_enabled()
+
+    monkeypatch.setattr(config, "LIST_CACHE_ENABLED", True)
+    assert is_list_cache_enabled()
@@ -0,0 +1,74 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.audit import audit_writer
+from src.core.config import config
+from src.enums import TodoStatus
+from tests.fixtures import SessionMaker, sqlite_session, test_client  # noqa: F401
+
+OTHER = {config.OWNER_HEADER: "other-user"}
+
+
+@pytest.mark.asyncio
+async def test_tasks_scoped_by_owner(test_client: TestClient, sqlite_session: AsyncSession):
+    task_id = test_client.post("/api/v1/tasks", json={"title": "mine", "description": "d"}).json()["id"]
+    test_client.post("/api/v1/tasks", json={"title": "theirs", "description": "d"}, headers=OTHER)
+
+    assert [task["title"] for task in test_client.get("/api/v1/tasks").json()] == ["mine"]
+    assert [task["title"] for task in test_client.get("/api/v1/tasks", headers=OTHER).json()] == ["theirs"]
+
+    # NOTE: чужая задача для владельца не существует
+    data = {"title": "stolen", "description": "d", "status": TodoStatus.COMPLETED}
+    assert test_client.get(f"/api/v1/tasks/{task_id}", headers=OTHER).status_code == 404
+    assert test_client.put(f"/api/v1/tasks/{task_id}", json=data, headers=OTHER).status_code == 404
+    assert test_client.delete(f"/api/v1/tasks/{task_id}", headers=OTHER).status_code == 404
+    assert test_client.get(f"/api/v1/tasks/{task_id}/tree", headers=OTHER).status_code == 404
+
+    response = test_client.post("/api/v1/tasks", json={"title": "child", "description": "d", "parent_id": task_id}, headers=OTHER)
+    assert response.status_code == 404
+
+    assert test_client.get(f"/api/v1/tasks/{task_id}").json()["title"] == "mine"
+
+
+@pytest.mark.asyncio
+async def test_history_scoped_by_owner(test_client: TestClient, sqlite_session: AsyncSession):
+    audit_writer.start(SessionMaker)
+    task_id = test_client.post("/api/v1/tasks", json={"title": "mine", "description": "d"}).json()["id"]
+    await audit_writer.stop()
+
+    assert len(test_client.get(f"/api/v1/tasks/{task_id}/history").json()) == 1
+    assert test_client.get(f"/api/v1/tasks/{task_id}/history", headers=OTHER).json() == []
+
+
+@pytest.mark.asyncio
+async def test_filter_by_status(test_client: TestClient, sqlite_session: AsyncSession):
+    for title in ("first", "second", "third"):
+        test_client.post("/api/v1/tasks", json={"title": title, "description": "d"})
+
+    task_id = test_client.get("/api/v1/tasks").json()[1]["id"]
+    data = {"title": "second", "description": "d", "status": TodoStatus.COMPLETED}
+    assert test_client.put(f"/api/v1/tasks/{task_id}", json=data).status_code == 200
+
+    response = test_client.get("/api/v1/tasks", params={"status": TodoStatus.PENDING})
+    assert [task["title"] for task in response.json()] == ["first", "third"]
+
+    response = test_client.get("/api/v1/tasks", params={"status": TodoStatus.COMPLETED})
+    assert [task["title"] for task in response.json()] == ["second"]
+
+
+@pytest.mark.asyncio
+async def test_owner_header_required(test_client: TestClient, sqlite_session: AsyncSession):
+    assert test_client.get("/api/v1/tasks", headers={config.OWNER_HEADER: ""}).status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_tasks_per_owner_limit(test_client: TestClient, sqlite_session: AsyncSession, monkeypatch):
+    monkeypatch.setattr(config, "TASKS_PER_OWNER_LIMIT", 2)
+
+    for i in range(2):
+        assert test_client.post("/api/v1/tasks", json={"title": f"task_{i}", "description": "d"}).status_code == 201
+
+    # NOTE: лимит считается для каждого владельца отдельно
+    assert test_client.post("/api/v1/tasks", json={"title": "task_2", "description": "d"}).status_code == 403
+    assert test_client.post("/api/v1/tasks", json={"title": "task_0", "description": "d"}, headers=OTHER).status_code == 201
@@ -0,0 +1,67 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database import Tag, TodoTask
+from tests.fixtures import sqlite_session, test_client  # noqa: F401
+
+
+@pytest.mark.asyncio
+async def test_create_task_with_tags(test_client: TestClient, sqlite_session: AsyncSession):
+    response = test_client.post(
+        "/api/v1/tasks", json={"title": "test_title", "description": "test_description", "tags": ["work", " home ", "work"]}
+    )
+    assert response.status_code == 201
+    assert response.json()["tags"] == ["home", "work"]
+
+    # NOTE: теги без дублей, повторное использование не создает новые строки
+    response = test_client.post("/api/v1/tasks", json={"title": "test_title_2", "description": "test_description_2", "tags": ["work"]})
+    assert response.status_code == 201
+
+    assert await sqlite_session.scalar(select(func.count()).select_from(Tag)) == 2
+
+    response = test_client.get(f"/api/v1/tasks/{response.json()['id']}")
+    assert response.json()["tags"] == ["work"]
+
+
+@pytest.mark.asyncio
+async def test_filter_tasks_by_tags(test_client: TestClient, sqlite_session: AsyncSession):
+    test_client.post("/api/v1/tasks", json={"title": "first", "description": "d", "tags": ["work", "urgent"]})
+    test_client.post("/api/v1/tasks", json={"title": "second", "description": "d", "tags": ["home"]})
+    test_client.post("/api/v1/tasks", json={"title": "third", "description": "d"})
+
+    assert len(test_client.get("/api/v1/tasks").json()) == 3
+    assert [task["title"] for task in test_client.get("/api/v1/tasks?tags=work").json()] == ["first"]
+    assert [task["title"] for task in test_client.get("/api/v1/tasks?tags=unknown").json()] == []
+
+    # NOTE: несколько тегов - задачи с любым из них, без повторов
+    response = test_client.get("/api/v1/tasks?tags=work&tags=urgent&tags=home")
+    assert sorted(task["title"] for task in response.json()) == ["first", "second"]
+
+
+@pytest.mark.asyncio
+async def test_update_task_tags(test_client: TestClient, sqlite_session: AsyncSession):
+    response = test_client.post("/api/v1/tasks", json={"title": "test_title", "description": "test_description", "tags": ["work"]})
+    task = response.json()
+
+    data = {"title": task["title"], "description": task["description"], "status": task["status"]}
+
+    # NOTE: без tags текущие теги сохраняются
+    response = test_client.put(f"/api/v1/tasks/{task['id']}", json=data)
+    assert response.status_code == 200
+    assert response.json()["tags"] == ["work"]
+
+    # NOTE: изменение только тегов - тоже новая версия задачи
+    version = response.json()["version"]
+    updated_at = await sqlite_session.scalar(select(TodoTask.updated_at).where(TodoTask.id == task["id"]))
+    response = test_client.put(f"/api/v1/tasks/{task['id']}", json={**data, "tags": ["home"]})
+    assert response.status_code == 200
+    assert response.json()["tags"] == ["home"]
+    assert response.json()["version"] == version + 1
+
+    assert [item["title"] for item in test_client.get("/api/v1/tasks?tags=work").json()] == []
+    assert len(test_client.get("/api/v1/tasks?tags=home").json()) == 1
+
+    # NOTE: updated_at меняется и при изменении только тегов
+    assert await sqlite_session.scalar(select(TodoTask.updated_at).where(TodoTask.id == task["id"])) != updated_at
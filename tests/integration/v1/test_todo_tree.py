@@ -0,0 +1,89 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.enums import TodoStatus
+from tests.fixtures import async_engine, sqlite_session, test_client  # noqa: F401
+
+
+def create_task(test_client: TestClient, title: str, parent_id: int | None = None) -> int:
+    response = test_client.post("/api/v1/tasks", json={"title": title, "description": "d", "parent_id": parent_id})
+    assert response.status_code == 201
+    assert response.json()["parent_id"] == parent_id
+    return response.json()["id"]
+
+
+def complete_task(test_client: TestClient, task_id: int) -> None:
+    response = test_client.put(f"/api/v1/tasks/{task_id}", json={"title": "done", "description": "d", "status": TodoStatus.COMPLETED})
+    assert response.status_code == 200
+
+
+def get_tree(test_client: TestClient, task_id: int, **params) -> list[dict]:
+    response = test_client.get(f"/api/v1/tasks/{task_id}/tree", params=params)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+@pytest.mark.asyncio
+async def test_task_tree(test_client: TestClient, sqlite_session: AsyncSession):
+    root = create_task(test_client, "root")
+    first = create_task(test_client, "first", root)
+    second = create_task(test_client, "second", root)
+    nested = create_task(test_client, "nested", first)
+    create_task(test_client, "other")
+
+    complete_task(test_client, nested)
+    complete_task(test_client, second)
+
+    # NOTE: все поддерево одним запросом к базе
+    statements = []
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(async_engine.sync_engine, "before_cursor_execute", listener)
+
+    try:
+        nodes = get_tree(test_client, root)
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", listener)
+
+    assert len([statement for statement in statements if "RECURSIVE" in statement]) == 1
+
+    # NOTE: родители идут раньше детей, счетчики посчитаны по всем потомкам
+    assert [(node["id"], node["depth"], node["subtasks"], node["completed_subtasks"]) for node in nodes] == [
+        (root, 0, 3, 2),
+        (first, 1, 1, 1),
+        (second, 1, 0, 0),
+        (nested, 2, 0, 0),
+    ]
+    assert nodes[3]["parent_id"] == first
+
+    # NOTE: ограничение глубины
+    assert [node["id"] for node in get_tree(test_client, root, depth=1)] == [root, first, second]
+    assert [node["id"] for node in get_tree(test_client, first, depth=0)] == [first]
+
+
+@pytest.mark.asyncio
+async def test_task_tree_not_found(test_client: TestClient, sqlite_session: AsyncSession):
+    assert test_client.get("/api/v1/tasks/1/tree").status_code == 404
+
+    response = test_client.post("/api/v1/tasks", json={"title": "orphan", "description": "d", "parent_id": 42})
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_delete_task_with_subtasks(test_client: TestClient, sqlite_session: AsyncSession):
+    root = create_task(test_client, "root")
+    child = create_task(test_client, "child", root)
+
+    # NOTE: задачу с подзадачами удалить нельзя - поддерево не удаляется мимо сервиса (без истории и сброса кэша)
+    response = test_client.delete(f"/api/v1/tasks/{root}")
+    assert response.status_code == 409
+    assert [node["id"] for node in get_tree(test_client, root)] == [root, child]
+
+    # NOTE: после удаления подзадач удаляется и сама задача
+    assert test_client.delete(f"/api/v1/tasks/{child}").status_code == 200
+    assert test_client.delete(f"/api/v1/tasks/{root}").status_code == 200
+    assert test_client.get(f"/api/v1/tasks/{root}").status_code == 404